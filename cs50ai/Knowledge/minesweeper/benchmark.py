@@ -0,0 +1,104 @@
+import random
+import sys
+import time
+
+from minesweeper import Minesweeper, MinesweeperAI
+from simulate import play
+
+# (name, height, width, mines) of the boards played
+BOARDS = [
+    ("beginner", 9, 9, 10),
+    ("expert", 16, 30, 99),
+    ("large", 100, 100, 1500),
+]
+
+# (height, width, mines) of the boards built and uncovered
+GRIDS = [
+    (100, 100, 1500),
+    (1000, 1000, 150000),
+]
+
+# (height, width) of the boards random moves are timed on
+POOLS = [(30, 30), (100, 100), (300, 300), (1000, 1000)]
+
+
+def main():
+    if len(sys.argv) > 3:
+        sys.exit("Usage: python benchmark.py [seed [games]]")
+    seed = int(sys.argv[1]) if len(sys.argv) > 1 else 0
+    games = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+
+    print(f"{'board':<10} {'moves':>6} {'guesses':>8} {'hit':>5} "
+          f"{'sentences':>10} {'ms/move':>9} {'max ms':>9}")
+    for name, height, width, mines in BOARDS:
+        # Mines stepped on are flagged, so every board is played out in full
+        played = [play(seed + game, height, width, mines, play_out=True)
+                  for game in range(games)]
+        times = [
+            latency for result in played for latency in result["latencies"]
+        ]
+        sentences = max(
+            size for result in played for _, size in result["knowledge"]
+        )
+        print(f"{name:<10} {len(times):>6} "
+              f"{sum(result['guesses'] for result in played):>8} "
+              f"{sum(result['hit'] for result in played):>5} "
+              f"{sentences:>10} "
+              f"{sum(times) / len(times) * 1e3:>9.3f} "
+              f"{max(times) * 1e3:>9.3f}")
+
+    print()
+    benchmark_grids(seed)
+    print()
+    benchmark_random_moves(seed)
+
+
+def benchmark_grids(seed=0):
+    """
+    Times building boards, counting the mines around every cell, and
+    uncovering every safe cell with reveal, starting from each covered
+    cell in turn.
+    """
+    print(f"{'board':<12} {'build s':>8} {'counts/s':>12} {'reveals/s':>12}")
+    for height, width, mines in GRIDS:
+        random.seed(seed)
+        start = time.perf_counter()
+        game = Minesweeper(height=height, width=width, mines=mines)
+        build = time.perf_counter() - start
+
+        cells = [(i, j) for i in range(height) for j in range(width)]
+        start = time.perf_counter()
+        for cell in cells:
+            game.nearby_mines(cell)
+        counting = time.perf_counter() - start
+
+        start = time.perf_counter()
+        revealed = 0
+        for cell in cells:
+            if not game.is_mine(cell):
+                revealed += len(game.reveal(cell))
+        revealing = time.perf_counter() - start
+
+        print(f"{f'{height}x{width}':<12} {build:>8.3f} "
+              f"{len(cells) / counting:>12.0f} {revealed / revealing:>12.0f}")
+
+
+def benchmark_random_moves(seed=0, calls=200):
+    """
+    Times make_random_move on boards of growing size at the start of a
+    game, when every cell is unknown and no sentence constrains any.
+    """
+    print(f"{'board':<12} {'us/random move':>15}")
+    for height, width in POOLS:
+        random.seed(seed)
+        ai = MinesweeperAI(height=height, width=width,
+                           mines=height * width * 15 // 100)
+        start = time.perf_counter()
+        for _ in range(calls):
+            ai.make_random_move()
+        elapsed = time.perf_counter() - start
+        print(f"{f'{height}x{width}':<12} {elapsed / calls * 1e6:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
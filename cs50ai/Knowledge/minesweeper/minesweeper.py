@@ -1,10 +1,17 @@
-import itertools
+import math
 import random
+from collections import deque
 
 
 class Minesweeper():
     """
     Minesweeper game representation
+
+    Cells are stored row by row in flat bytearrays with a one-cell
+    border all around, so the neighbors of every cell are at the same
+    fixed offsets: cell (i, j) is at index (i + 1) * stride + j + 1.
+    `board` holds 1 for each mine and `counts` the number of mines
+    around each cell, worked out once when the mines are laid.
     """
 
     def __init__(self, height=8, width=8, mines=20):
@@ -12,27 +19,45 @@ class Minesweeper():
         # Set initial width, height, and number of mines
         self.height = height
         self.width = width
-        self.mines = set()
-
-        # Initialize an empty field with no mines
-        self.board = []
-        for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                row.append(False)
-            self.board.append(row)
+        self.stride = stride = width + 2
+        self.offsets = (
+            -stride - 1, -stride, -stride + 1, -1, 1,
+            stride - 1, stride, stride + 1,
+        )
 
         # Add mines randomly
-        while len(self.mines) != mines:
-            i = random.randrange(height)
-            j = random.randrange(width)
-            if not self.board[i][j]:
-                self.mines.add((i, j))
-                self.board[i][j] = True
+        size = (height + 2) * stride
+        self.board = bytearray(size)
+        laid = [divmod(cell, width) for cell in random.sample(range(height * width), mines)]
+        for cell in laid:
+            self.board[self.index(cell)] = 1
+        self.mines = set(laid)
+
+        # Read as one little-endian integer, the board shifted by each
+        # offset lines every cell up with one of its neighbors, and a sum
+        # of at most 8 never carries into the next byte
+        board = int.from_bytes(self.board, "little")
+        counts = 0
+        for offset in self.offsets:
+            counts += board >> (8 * offset) if offset > 0 else board << (-8 * offset)
+        self.counts = bytearray(counts.to_bytes(size + stride + 1, "little")[:size])
+
+        # Cells uncovered by reveal, with the border marked uncovered so
+        # that reveal never steps onto it
+        self.revealed = bytearray(size)
+        self.revealed[:stride] = self.revealed[-stride:] = b"\x01" * stride
+        self.revealed[::stride] = self.revealed[stride - 1::stride] = b"\x01" * (height + 2)
 
         # At first, player has found no mines
         self.mines_found = set()
 
+    def index(self, cell):
+        """
+        Returns the position of cell (i, j) in the board's arrays.
+        """
+        i, j = cell
+        return (i + 1) * self.stride + j + 1
+
     def print(self):
         """
         Prints a text-based representation
@@ -41,7 +66,7 @@ class Minesweeper():
         for i in range(self.height):
             print("--" * self.width + "-")
             for j in range(self.width):
-                if self.board[i][j]:
+                if self.board[self.index((i, j))]:
                     print("|X", end="")
                 else:
                     print("| ", end="")
@@ -49,8 +74,7 @@ class Minesweeper():
         print("--" * self.width + "-")
 
     def is_mine(self, cell):
-        i, j = cell
-        return self.board[i][j]
+        return bool(self.board[self.index(cell)])
 
     def nearby_mines(self, cell):
         """
@@ -58,24 +82,35 @@ class Minesweeper():
         within one row and column of a given cell,
         not including the cell itself.
         """
+        return self.counts[self.index(cell)]
 
-        # Keep count of nearby mines
-        count = 0
-
-        # Loop over all cells within one row and column
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
-
-                # Ignore the cell itself
-                if (i, j) == cell:
-                    continue
-
-                # Update count if cell in bounds and is mine
-                if 0 <= i < self.height and 0 <= j < self.width:
-                    if self.board[i][j]:
-                        count += 1
-
-        return count
+    def reveal(self, cell):
+        """
+        Uncovers a safe cell, and, as a player's click would, every cell
+        around it if no mines are nearby, spreading across the whole
+        region of such cells. Returns the cells newly uncovered.
+        """
+        start = self.index(cell)
+        revealed = self.revealed
+        if self.board[start] or revealed[start]:
+            return []
+        counts = self.counts
+        offsets = self.offsets
+        revealed[start] = 1
+        found = [start]
+        stack = [start]
+        while stack:
+            index = stack.pop()
+            if counts[index]:
+                continue
+            for offset in offsets:
+                neighbor = index + offset
+                if not revealed[neighbor]:
+                    revealed[neighbor] = 1
+                    found.append(neighbor)
+                    stack.append(neighbor)
+        stride = self.stride
+        return [(index // stride - 1, index % stride - 1) for index in found]
 
     def won(self):
         """
@@ -89,28 +124,39 @@ class Sentence():
     Logical statement about a Minesweeper game
     A sentence consists of a set of board cells,
     and a count of the number of those cells which are mines.
+
+    Sentences are immutable, so each is hashed once and can be kept in
+    sets; marking a cell returns a new sentence.
     """
 
+    __slots__ = ("cells", "count", "_hash")
+
     def __init__(self, cells, count):
-        self.cells = set(cells)
-        self.count = count
-    
+        object.__setattr__(self, "cells", frozenset(cells))
+        object.__setattr__(self, "count", count)
+        object.__setattr__(self, "_hash", hash((self.cells, count)))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Sentence is immutable")
+
     def __hash__(self):
-        return hash((frozenset(self.cells), self.count))
+        return self._hash
 
     def __eq__(self, other):
-        return self.cells == other.cells and self.count == other.count
+        if not isinstance(other, Sentence):
+            return NotImplemented
+        return self.count == other.count and self.cells == other.cells
 
     def __str__(self):
-        return f"{self.cells} = {self.count}"
+        return f"{set(self.cells)} = {self.count}"
 
     def known_mines(self):
         """
         Returns the set of all cells in self.cells known to be mines.
         """
         if len(self.cells) == self.count:
-            return self.cells   
-        return set()
+            return self.cells
+        return frozenset()
 
     def known_safes(self):
         """
@@ -118,26 +164,25 @@ class Sentence():
         """
         if self.count == 0:
             return self.cells
-        return set()
+        return frozenset()
 
     def mark_mine(self, cell):
         """
-        Updates internal knowledge representation given the fact that
-        a cell is known to be a mine.
+        Returns the sentence that follows from this one given the fact
+        that a cell is known to be a mine.
         """
         if cell in self.cells:
-            self.cells.remove(cell)
-            self.count-=1
-
+            return Sentence(self.cells - {cell}, self.count - 1)
+        return self
 
     def mark_safe(self, cell):
         """
-        Updates internal knowledge representation given the fact that
-        a cell is known to be safe.
+        Returns the sentence that follows from this one given the fact
+        that a cell is known to be safe.
         """
         if cell in self.cells:
-            self.cells.remove(cell)
-
+            return Sentence(self.cells - {cell}, self.count)
+        return self
 
 
 class MinesweeperAI():
@@ -145,12 +190,15 @@ class MinesweeperAI():
     Minesweeper game player
     """
 
-    def __init__(self, height=8, width=8):
+    def __init__(self, height=8, width=8, mines=None, max_knowledge=None):
 
         # Set initial height and width
         self.height = height
         self.width = width
 
+        # Number of mines on the board, if known
+        self.total_mines = mines
+
         # Keep track of which cells have been clicked on
         self.moves_made = set()
 
@@ -158,8 +206,28 @@ class MinesweeperAI():
         self.mines = set()
         self.safes = set()
 
-        # List of sentences about the game known to be true
-        self.knowledge = []
+        # Safe cells not yet chosen
+        self.safe_moves = set()
+
+        # Unknown cells in no sentence, as a list for O(1) random choice
+        # and a dict of each cell's position in it for O(1) removal
+        self.pool = [(i, j) for i in range(height) for j in range(width)]
+        self.pool_index = {cell: n for n, cell in enumerate(self.pool)}
+
+        # Set of sentences about the game known to be true, holding at
+        # most max_knowledge of them if that is set
+        self.knowledge = set()
+        self.max_knowledge = max_knowledge
+
+        # Cell -> the sentences mentioning it
+        self.index = {}
+
+        # Sentences added since inference last reached a fixpoint
+        self.worklist = deque()
+
+        # Mine counts for the constraint components of the last call to
+        # mine_probabilities, keyed by their sentences
+        self.solved = {}
 
     def mark_mine(self, cell):
         """
@@ -167,8 +235,10 @@ class MinesweeperAI():
         to mark that cell as a mine as well.
         """
         self.mines.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_mine(cell)
+        self.leave_pool(cell)
+        for sentence in self.index.pop(cell, ()):
+            self.remove_sentence(sentence)
+            self.add_sentence(sentence.mark_mine(cell))
 
     def mark_safe(self, cell):
         """
@@ -176,8 +246,86 @@ class MinesweeperAI():
         to mark that cell as safe as well.
         """
         self.safes.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_safe(cell)
+        if cell not in self.moves_made:
+            self.safe_moves.add(cell)
+        self.leave_pool(cell)
+        for sentence in self.index.pop(cell, ()):
+            self.remove_sentence(sentence)
+            self.add_sentence(sentence.mark_safe(cell))
+
+    def add_sentence(self, sentence):
+        """
+        Adds a sentence to the knowledge base and the cell index, and
+        queues it for inference, unless it is empty or already known.
+        If that takes the knowledge base past max_knowledge, the sentence
+        with the most cells, which says the least about each, is dropped.
+        """
+        if not sentence.cells or sentence in self.knowledge:
+            return
+        self.knowledge.add(sentence)
+        for cell in sentence.cells:
+            if cell not in self.index:
+                self.index[cell] = set()
+                self.leave_pool(cell)
+            self.index[cell].add(sentence)
+        self.worklist.append(sentence)
+
+        if self.max_knowledge is not None and len(self.knowledge) > self.max_knowledge:
+            self.remove_sentence(max(self.knowledge, key=lambda s: len(s.cells)))
+
+    def remove_sentence(self, sentence):
+        """
+        Drops a sentence from the knowledge base and the cell index.
+        """
+        self.knowledge.discard(sentence)
+        for cell in sentence.cells:
+            sentences = self.index.get(cell)
+            if sentences is not None:
+                sentences.discard(sentence)
+                if not sentences:
+                    del self.index[cell]
+                    if cell not in self.safes and cell not in self.mines:
+                        self.join_pool(cell)
+
+    def join_pool(self, cell):
+        """
+        Adds an unknown cell that no sentence mentions to the pool.
+        """
+        if cell not in self.pool_index:
+            self.pool_index[cell] = len(self.pool)
+            self.pool.append(cell)
+
+    def leave_pool(self, cell):
+        """
+        Takes a cell out of the pool, if it is there, by moving the last
+        cell into its place.
+        """
+        n = self.pool_index.pop(cell, None)
+        if n is None:
+            return
+        last = self.pool.pop()
+        if last != cell:
+            self.pool[n] = last
+            self.pool_index[last] = n
+
+    def sentences_within(self, cells):
+        """
+        Returns the sentences whose cells are all in `cells`.
+        """
+        found = set()
+        for cell in cells:
+            for sentence in self.index.get(cell, ()):
+                if sentence.cells <= cells:
+                    found.add(sentence)
+        return found
+
+    def sentences_with(self, cells):
+        """
+        Returns the sentences mentioning every cell in `cells`, which
+        must not be empty.
+        """
+        smallest = min((self.index.get(cell, ()) for cell in cells), key=len)
+        return [sentence for sentence in smallest if cells <= sentence.cells]
 
     def add_knowledge(self, cell, count):
         """
@@ -187,6 +335,7 @@ class MinesweeperAI():
 
         # 1) 记录已经点击的安全单元格
         self.moves_made.add(cell)
+        self.safe_moves.discard(cell)
 
         # 2) 记录为安全单元
         self.mark_safe(cell)
@@ -204,41 +353,60 @@ class MinesweeperAI():
         count -= known_mines
         new_cells -= self.mines  # 去掉已知的雷
 
-        if new_cells:
-            self.knowledge.append(Sentence(new_cells, count))
-        # 5) 句子推理：创建新句子
-        inferred_sentences = []
-        for s1 in self.knowledge:
-            for s2 in self.knowledge:
-                if s1 != s2 and s1.cells.issubset(s2.cells):
-                    new_sentence = Sentence(s2.cells - s1.cells, s2.count - s1.count)
-                    if new_sentence not in self.knowledge and new_sentence not in inferred_sentences:
-                        inferred_sentences.append(new_sentence)
-
-        self.knowledge += inferred_sentences
-        # 4) 不断更新知识，直到不再有新的信息
-        while True:  
-            safes_to_mark = set()
-            mines_to_mark = set()
-
-            for sentence in self.knowledge:
-                safes_to_mark.update(sentence.known_safes())
-                mines_to_mark.update(sentence.known_mines())
-
-            if not safes_to_mark and not mines_to_mark:
-                break  
-
-            for safe_cell in safes_to_mark:
-                self.mark_safe(safe_cell)
-
-            for mine_cell in mines_to_mark:
-                self.mark_mine(mine_cell)
-
-
-        # 6) 清理知识库
-        self.knowledge = [s for s in self.knowledge if s.cells]  # 删除空句子
+        self.add_sentence(Sentence(new_cells, count))
 
+        # 4) 5) 推理直到不动点
+        self.infer()
 
+    def infer(self):
+        """
+        Draws every conclusion that follows from the sentences on the
+        worklist, until the knowledge base reaches a fixpoint. Marking a
+        cell replaces the sentences it changes and subset inference adds
+        new ones, and both queue what they add, so only sentences
+        affected by the latest change are looked at again.
+
+        Subset inference replaces the superset with the difference: the
+        subset and the difference together say the same thing, so the
+        knowledge base never grows from inference alone.
+        """
+        while self.worklist:
+            sentence = self.worklist.popleft()
+            if sentence not in self.knowledge:
+                continue
+
+            # Cells the sentence settles, which in turn updates the
+            # sentences that mention them
+            safes = sentence.known_safes()
+            mines = sentence.known_mines()
+            if safes or mines:
+                for cell in safes:
+                    self.mark_safe(cell)
+                for cell in mines:
+                    self.mark_mine(cell)
+                continue
+
+            # Subset inference with the sentence as the subset, then as
+            # the superset, which replaces it
+            for superset in self.sentences_with(sentence.cells):
+                if superset != sentence:
+                    self.infer_difference(superset, sentence)
+            if sentence not in self.knowledge:
+                continue
+            for subset in self.sentences_within(sentence.cells):
+                if subset != sentence:
+                    self.infer_difference(sentence, subset)
+                    break
+
+    def infer_difference(self, superset, subset):
+        """
+        Replaces `superset` with the sentence saying that its cells
+        missing from `subset` hold the difference of their counts.
+        """
+        self.remove_sentence(superset)
+        self.add_sentence(Sentence(
+            superset.cells - subset.cells, superset.count - subset.count
+        ))
 
     def make_safe_move(self):
         """
@@ -249,36 +417,259 @@ class MinesweeperAI():
         This function may use the knowledge in self.mines, self.safes
         and self.moves_made, but should not modify any of those values.
         """
-        for safe_cell in self.safes:
-            if safe_cell not in self.moves_made:
-                return safe_cell
+        if self.safe_moves:
+            return next(iter(self.safe_moves))
         return None
 
     def make_random_move(self):
         """
         Returns a move to make on the Minesweeper board.
-        Should choose randomly among cells that:
-            1) have not already been chosen, and
-            2) are not known to be mines, and
-            3) are not part of any knowledge statements (to avoid uncertainty)
+        Chooses the cell that has not already been chosen and is least
+        likely to be a mine, given the knowledge base (see
+        mine_probabilities). Ties go randomly, and cells not part of any
+        knowledge statement win them, as no sentence is about them.
+        """
+        if self.safe_moves:
+            return random.choice(sorted(self.safe_moves))
+
+        frontier, rest = self.mine_probabilities()
+        least = min(frontier.values(), default=math.inf)
+        if self.pool and (least > 0 if rest is None else rest <= least):
+            return random.choice(self.pool)
+        if frontier:
+            return random.choice(sorted(
+                cell for cell, p in frontier.items() if p <= least + 1e-9
+            ))
+
+        # 所有格子都已选过或者是雷，没有可选的格子
+        return None
+
+    def mine_probabilities(self):
+        """
+        Returns (frontier, rest): a dict of the probability that each cell
+        in a knowledge statement is a mine, and the probability that any
+        other unknown cell is, or None if the number of mines is unknown.
+
+        The frontier splits into components that share no sentence, whose
+        mine placements are counted exactly and independently. Counts for
+        components whose sentences haven't changed are reused. Each total
+        number of frontier mines K is then weighted by C(U, M - K), the
+        ways to place the remaining M - K mines in the U other cells.
+        """
+        sentences = list(self.knowledge)
+
+        # Union-find over cells, joining the cells of each sentence
+        parent = {}
+
+        def find(cell):
+            while parent[cell] != cell:
+                parent[cell] = parent[parent[cell]]
+                cell = parent[cell]
+            return cell
+
+        for sentence in sentences:
+            cells = list(sentence.cells)
+            for cell in cells:
+                parent.setdefault(cell, cell)
+            root = find(cells[0])
+            for cell in cells[1:]:
+                other = find(cell)
+                if other != root:
+                    parent[other] = root
+        groups = {}
+        for sentence in sentences:
+            groups.setdefault(find(next(iter(sentence.cells))), []).append(sentence)
+
+        solved = {}
+        components = []
+        for group in groups.values():
+            key = frozenset(group)
+            if key not in solved:
+                solved[key] = self.solved.get(key) or count_configurations(key)
+            components.append(solved[key])
+        self.solved = solved
+
+        # weights[K] is proportional to the number of ways to place the
+        # remaining mines given K of them on the frontier
+        frontier_cells = sum(len(marginals) for _, marginals in components)
+        others = len(self.pool)
+        if self.total_mines is None:
+            weights = [1.0] * (frontier_cells + 1)
+        else:
+            remaining = self.total_mines - len(self.mines)
+            weights = binomial_weights(others, remaining, frontier_cells)
+
+        # Mine counts of all components but each one, from the products
+        # of the components before it and after it
+        totals = [scaled(total) for total, _ in components]
+        before = [[1.0]]
+        for total in totals:
+            before.append(scaled(convolve(before[-1], total)))
+        after = [[1.0]]
+        for total in reversed(totals):
+            after.append(scaled(convolve(after[-1], total)))
+        after.reverse()
+
+        frontier = {}
+        for c, (total, marginals) in enumerate(components):
+            rest_of = convolve(before[c], after[c + 1])
+            # weighted[k] weighs this component holding k mines
+            weighted = [
+                sum(rest_of[j] * weights[k + j] for j in range(len(rest_of)))
+                for k in range(len(total))
+            ]
+            norm = sum(t * w for t, w in zip(total, weighted))
+            for cell, counts in marginals.items():
+                frontier[cell] = sum(
+                    n * w for n, w in zip(counts, weighted)
+                ) / norm
+
+        if self.total_mines is None or others == 0:
+            return frontier, None
+        everything = before[-1]
+        norm = sum(n * weights[k] for k, n in enumerate(everything))
+        expected = sum(
+            n * weights[k] * (remaining - k) for k, n in enumerate(everything)
+        ) / norm
+        return frontier, expected / others
+
+
+def count_configurations(sentences):
+    """
+    Counts the mine placements consistent with a connected set of
+    sentences. Returns (totals, marginals): totals[k] is the number of
+    placements with k mines, and marginals[cell][k] the number of those
+    in which `cell` is a mine.
+
+    Cells are assigned in breadth-first order, so each sentence is open
+    for a short stretch. The placements of the cells before position i
+    reduce to the mines still owed by the open sentences, and forward and
+    backward passes over those states count placements without listing
+    them.
+    """
+    sentences = [(sentence.cells, sentence.count) for sentence in sentences]
+    containing = {}
+    for j, (cells, _) in enumerate(sentences):
+        for cell in cells:
+            containing.setdefault(cell, []).append(j)
+
+    # Breadth-first order from the top-left cell
+    start = min(containing)
+    order = [start]
+    seen = {start}
+    for cell in order:
+        for j in containing[cell]:
+            for other in sorted(sentences[j][0] - seen):
+                seen.add(other)
+                order.append(other)
+    n = len(order)
+    position = {cell: i for i, cell in enumerate(order)}
+
+    # Each sentence is open from its first cell to its last
+    first = [min(position[cell] for cell in cells) for cells, _ in sentences]
+    last = [max(position[cell] for cell in cells) for cells, _ in sentences]
+    left = [
+        {position[cell]: sum(position[other] > position[cell] for other in cells)
+         for cell in cells}
+        for cells, _ in sentences
+    ]
+    active = [
+        [j for j in range(len(sentences)) if first[j] < i <= last[j]]
+        for i in range(n + 1)
+    ]
+    at = [containing[cell] for cell in order]
+
+    def step(i, state, mine):
+        """
+        Returns the state after cell i is assigned, or None if that breaks
+        a sentence.
         """
-        all_cells = set(itertools.product(range(self.height), range(self.width)))
-        knowledge_cells = set()
+        owed = dict(zip(active[i], state))
+        for j in at[i]:
+            still = owed.get(j, sentences[j][1]) - mine
+            if not 0 <= still <= left[j][i]:
+                return None
+            owed[j] = still
+        return tuple(owed[j] for j in active[i + 1])
+
+    # forward[i][state][k]: placements of cells before i with k mines
+    forward = [{(): [1]}]
+    for i in range(n):
+        states = {}
+        for state, counts in forward[i].items():
+            for mine in (0, 1):
+                following = step(i, state, mine)
+                if following is not None:
+                    add_into(states, following, counts, mine)
+        forward.append(states)
+
+    # backward[i][state][k]: placements of cells from i with k mines
+    backward = [None] * n + [{(): [1]}]
+    for i in reversed(range(n)):
+        states = {}
+        for state in forward[i]:
+            for mine in (0, 1):
+                following = step(i, state, mine)
+                if following in backward[i + 1]:
+                    add_into(states, state, backward[i + 1][following], mine)
+        backward[i] = states
+
+    marginals = {}
+    for i, cell in enumerate(order):
+        counts = [0] * (n + 1)
+        for state, before in forward[i].items():
+            following = step(i, state, 1)
+            if following in backward[i + 1]:
+                for k, ways in enumerate(convolve(before, backward[i + 1][following])):
+                    counts[k + 1] += ways
+        marginals[cell] = counts
+    return forward[n][()] + [0] * (n + 1 - len(forward[n][()])), marginals
+
+
+def add_into(table, state, counts, shift):
+    """
+    Adds the polynomial `counts`, shifted by `shift`, to table[state].
+    """
+    total = table.setdefault(state, [])
+    if len(total) < len(counts) + shift:
+        total.extend([0] * (len(counts) + shift - len(total)))
+    for k, ways in enumerate(counts):
+        total[k + shift] += ways
 
-        # 收集所有 knowledge 里涉及的点
-        for sentence in self.knowledge:
-            knowledge_cells.update(sentence.cells)
 
-        # 过滤掉已知地雷、已选点，以及 knowledge 里涉及的点
-        possible_cells = all_cells - self.moves_made - self.mines - knowledge_cells
+def convolve(a, b):
+    """
+    Returns the product of the polynomials with coefficients `a` and `b`.
+    """
+    product = [0] * (len(a) + len(b) - 1)
+    for i, x in enumerate(a):
+        if x:
+            for j, y in enumerate(b):
+                product[i + j] += x * y
+    return product
 
-        if possible_cells:
-            return random.choice(list(possible_cells))
-        
-        # 如果 `possible_cells` 为空，则尝试从所有未选过的非雷点中选择
-        fallback_cells = all_cells - self.moves_made - self.mines
-        if fallback_cells:
-            return random.choice(list(fallback_cells))
 
-        # 所有格子都已选过或者是雷，没有可选的格子
-        return None
+def scaled(counts):
+    """
+    Returns `counts` as floats scaled so the largest is 1. Probabilities
+    are ratios of such products, so the scale cancels out.
+    """
+    largest = max(counts)
+    return [count / largest for count in counts]
+
+
+def binomial_weights(others, remaining, frontier):
+    """
+    Returns, for each number of mines K from 0 to `frontier`, a weight
+    proportional to C(others, remaining - K).
+    """
+    logs = [
+        math.lgamma(others + 1) - math.lgamma(remaining - k + 1)
+        - math.lgamma(others - remaining + k + 1)
+        if 0 <= remaining - k <= others else -math.inf
+        for k in range(frontier + 1)
+    ]
+    largest = max(logs)
+    if largest == -math.inf:
+        return [0.0] * (frontier + 1)
+    return [math.exp(log - largest) for log in logs]
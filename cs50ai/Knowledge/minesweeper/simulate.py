@@ -0,0 +1,141 @@
+"""
+Headless Minesweeper games between Minesweeper and MinesweeperAI
+
+Plays seeded games across worker processes and reports the AI's win
+rate, moves per second, per-move latency percentiles and the size of
+its knowledge base as games progress.
+
+Usage: python simulate.py [options]
+"""
+
+import argparse
+import multiprocessing
+import random
+import statistics
+import time
+from functools import partial
+
+from minesweeper import Minesweeper, MinesweeperAI
+
+# Knowledge base sizes are reported for each tenth of a game's progress
+STAGES = 10
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate Minesweeper games.")
+    parser.add_argument("--games", type=int, default=100,
+                        help="number of games to play (default 100)")
+    parser.add_argument("--board", type=int, nargs=2, default=(16, 30),
+                        metavar=("HEIGHT", "WIDTH"),
+                        help="board size (default 16 30)")
+    parser.add_argument("--density", type=float, default=0.2,
+                        help="fraction of cells that are mines (default 0.2)")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="processes to play games in (0 = one per CPU)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed of the first game (default 0)")
+    parser.add_argument("--max-knowledge", type=int, default=None,
+                        help="most sentences the AI may keep (default no limit)")
+    args = parser.parse_args()
+    if args.games < 1:
+        parser.error("--games must be at least 1")
+
+    height, width = args.board
+    mines = round(height * width * args.density)
+    if not 0 < mines < height * width:
+        parser.error("density must leave at least one mine and one safe cell")
+
+    play_game = partial(play, height=height, width=width, mines=mines,
+                        max_knowledge=args.max_knowledge)
+    seeds = range(args.seed, args.seed + args.games)
+    start = time.perf_counter()
+    with multiprocessing.Pool(args.workers or None) as pool:
+        results = pool.map(play_game, seeds)
+    elapsed = time.perf_counter() - start
+    print(f"{args.games} games on {height}x{width} boards with {mines} mines")
+    report(results, elapsed)
+
+
+def play(seed, height=16, width=30, mines=99, max_knowledge=None,
+         ai_class=MinesweeperAI, play_out=False):
+    """
+    Plays the game with the given seed until the AI steps on a mine or
+    has uncovered every safe cell. With `play_out`, a mine stepped on is
+    flagged and the game goes on, so that the board is played out in
+    full. Returns a dict of whether the AI won, how many of its moves
+    were random guesses and how many hit mines, the seconds each move
+    took, and the knowledge base size after each move that didn't end
+    the game with the fraction of safe cells uncovered by then.
+    """
+    random.seed(seed)
+    game = Minesweeper(height=height, width=width, mines=mines)
+    ai = ai_class(height=height, width=width, mines=mines,
+                  max_knowledge=max_knowledge)
+    safe_cells = height * width - mines
+
+    latencies = []
+    knowledge = []
+    guesses = hit = 0
+    while len(ai.moves_made) < safe_cells:
+        start = time.perf_counter()
+        move = ai.make_safe_move()
+        if move is None:
+            move = ai.make_random_move()
+            if move is None:
+                break
+            guesses += 1
+        if game.is_mine(move):
+            hit += 1
+            if not play_out:
+                latencies.append(time.perf_counter() - start)
+                break
+            ai.mark_mine(move)
+        else:
+            ai.add_knowledge(move, game.nearby_mines(move))
+        latencies.append(time.perf_counter() - start)
+        knowledge.append((len(ai.moves_made) / safe_cells, len(ai.knowledge)))
+
+    return {
+        "won": not hit and len(ai.moves_made) == safe_cells,
+        "guesses": guesses,
+        "hit": hit,
+        "latencies": latencies,
+        "knowledge": knowledge,
+    }
+
+
+def report(results, elapsed):
+    """
+    Prints the win rate, speed, latency and knowledge base statistics of
+    the games played.
+    """
+    games = len(results)
+    wins = sum(result["won"] for result in results)
+    latencies = [
+        latency for result in results for latency in result["latencies"]
+    ]
+    print(f"Won {wins} of {games} ({wins / games:.1%})")
+    print(f"{len(latencies)} moves in {elapsed:.2f}s "
+          f"({len(latencies) / elapsed:.0f} moves/s, "
+          f"{games / elapsed:.1f} games/s)")
+    if len(latencies) > 1:
+        cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+        print(f"Move latency (ms): p50 {cuts[49] * 1e3:.3f}, "
+              f"p90 {cuts[89] * 1e3:.3f}, p99 {cuts[98] * 1e3:.3f}, "
+              f"max {max(latencies) * 1e3:.3f}")
+
+    # Mean and largest knowledge base in each stage of the games
+    stages = [[] for _ in range(STAGES)]
+    for result in results:
+        for progress, size in result["knowledge"]:
+            stages[min(int(progress * STAGES), STAGES - 1)].append(size)
+    print("Knowledge base size by share of safe cells uncovered:")
+    for stage, sizes in enumerate(stages):
+        if sizes:
+            print(f"  {stage * 100 // STAGES:>3}-{(stage + 1) * 100 // STAGES}%: "
+                  f"mean {statistics.fmean(sizes):>7.1f}, max {max(sizes):>5} "
+                  f"({len(sizes)} moves)")
+
+
+if __name__ == "__main__":
+    main()
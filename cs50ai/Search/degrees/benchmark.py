@@ -0,0 +1,485 @@
+import csv
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import time
+import tracemalloc
+from collections import deque
+
+import degrees
+import util
+from graph import Graph
+
+QUERIES = 20
+WORKER_QUERIES = 200
+
+
+class ListStackFrontier():
+    """
+    The original list-backed frontier, kept for comparison.
+    """
+
+    def __init__(self):
+        self.frontier = []
+
+    def add(self, node):
+        self.frontier.append(node)
+
+    def contains_state(self, state):
+        return any(node.state == state for node in self.frontier)
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier[-1]
+            self.frontier = self.frontier[:-1]
+            return node
+
+
+class ListQueueFrontier(ListStackFrontier):
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier[0]
+            self.frontier = self.frontier[1:]
+            return node
+
+
+def main():
+    directory = sys.argv[1] if len(sys.argv) > 1 else "large"
+    names = sys.argv[2:] or list(BENCHMARKS)
+    if any(name not in BENCHMARKS for name in names):
+        sys.exit("Usage: python benchmark.py [directory] "
+                 f"[{' | '.join(BENCHMARKS)} ...]")
+
+    print("Loading data...")
+    degrees.load_data(directory)
+    print("Data loaded.")
+
+    pairs = sample_pairs(QUERIES)
+    for name in names:
+        BENCHMARKS[name](directory, pairs)
+
+
+def sample_pairs(n, seed=0):
+    """
+    Return `n` reproducible (source, target) pairs of person ids.
+    """
+    rng = random.Random(seed)
+    person_ids = sorted(degrees.graph.person_ids)
+    return [
+        (rng.choice(person_ids), rng.choice(person_ids))
+        for _ in range(n)
+    ]
+
+
+def timed(search, pairs):
+    """
+    Run `search` on every pair, returning (seconds, path lengths).
+    """
+    lengths = []
+    start = time.perf_counter()
+    for source, target in pairs:
+        path = search(source, target)
+        lengths.append(None if path is None else len(path))
+    return time.perf_counter() - start, lengths
+
+
+def frontier_shortest_path(source, target, frontier_class):
+    """
+    The original Node/frontier breadth-first search.
+    """
+    start = util.Node(state=source, parent=None, action=None)
+    frontier = frontier_class()
+    frontier.add(start)
+    explored = set()
+    while not frontier.empty():
+        node = frontier.remove()
+        if node.state == target:
+            path = []
+            while node.parent is not None:
+                path.append((node.action, node.state))
+                node = node.parent
+            path.reverse()
+            return path
+        explored.add(node.state)
+        for movie_id, person_id in degrees.neighbors_for_person(node.state):
+            if not frontier.contains_state(person_id) and person_id not in explored:
+                frontier.add(util.Node(state=person_id, parent=node, action=movie_id))
+    return None
+
+
+def benchmark_frontiers(directory, pairs):
+    """
+    Compare the Node/frontier search on list-backed and deque-backed
+    frontiers.
+    """
+    old, old_lengths = timed(
+        lambda source, target: frontier_shortest_path(source, target, ListQueueFrontier),
+        pairs
+    )
+    new, new_lengths = timed(
+        lambda source, target: frontier_shortest_path(source, target, util.QueueFrontier),
+        pairs
+    )
+    assert old_lengths == new_lengths
+
+    print(f"Frontier ({len(pairs)} queries)")
+    print(f"  list:  {old:.3f}s")
+    print(f"  deque: {new:.3f}s ({old / new:.1f}x)")
+
+
+def benchmark_bidirectional(directory, pairs):
+    """
+    Check bidirectional search against plain BFS and compare their speed.
+    """
+    old, old_lengths = timed(degrees.shortest_path, pairs)
+    new, new_lengths = timed(degrees.bidirectional_shortest_path, pairs)
+    assert old_lengths == new_lengths
+
+    print(f"Bidirectional ({len(pairs)} queries)")
+    print(f"  bfs:           {old:.3f}s")
+    print(f"  bidirectional: {new:.3f}s ({old / new:.1f}x)")
+
+
+def legacy_load_data(directory):
+    """
+    The original dict-of-sets loader, returning (names, people, movies).
+    """
+    names = {}
+    people = {}
+    movies = {}
+    with open(f"{directory}/people.csv", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            people[row["id"]] = {
+                "name": row["name"],
+                "birth": row["birth"],
+                "movies": set()
+            }
+            names.setdefault(row["name"].lower(), set()).add(row["id"])
+    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            movies[row["id"]] = {
+                "title": row["title"],
+                "year": row["year"],
+                "stars": set()
+            }
+    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            try:
+                people[row["person_id"]]["movies"].add(row["movie_id"])
+                movies[row["movie_id"]]["stars"].add(row["person_id"])
+            except KeyError:
+                pass
+    return names, people, movies
+
+
+def legacy_shortest_path(people, movies, source, target):
+    """
+    Breadth-first search over the dict-of-sets representation.
+    """
+    if source == target:
+        return []
+    parents = {source: None}
+    queue = deque([source])
+    while queue:
+        person_id = queue.popleft()
+        for movie_id in people[person_id]["movies"]:
+            for star_id in movies[movie_id]["stars"]:
+                if star_id in parents:
+                    continue
+                parents[star_id] = (movie_id, person_id)
+                if star_id == target:
+                    path = []
+                    while parents[star_id] is not None:
+                        path.append(parents[star_id][0])
+                        star_id = parents[star_id][1]
+                    return path
+                queue.append(star_id)
+    return None
+
+
+def reset():
+    """
+    Discard the data loaded into degrees.
+    """
+    degrees.graph = Graph()
+
+
+def traced(load, *args):
+    """
+    Call `load`, returning its result and the memory it left allocated.
+    """
+    tracemalloc.start()
+    try:
+        result = load(*args)
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, size
+
+
+def benchmark_csr(directory, pairs):
+    """
+    Compare memory and search time of the dict-of-sets and CSR graphs.
+    """
+    (_, people, movies), old_size = traced(legacy_load_data, directory)
+    old, old_lengths = timed(
+        lambda source, target: legacy_shortest_path(people, movies, source, target),
+        pairs
+    )
+    del people, movies
+
+    reset()
+    _, new_size = traced(degrees.load_csv, directory)
+    new, new_lengths = timed(degrees.shortest_path, pairs)
+    assert old_lengths == new_lengths
+
+    print(f"CSR graph ({len(pairs)} queries)")
+    print(f"  dict of sets: {old_size / 2 ** 20:.1f} MiB, {old:.3f}s")
+    print(f"  csr arrays:   {new_size / 2 ** 20:.1f} MiB, {new:.3f}s "
+          f"({old_size / new_size:.1f}x memory, {old / new:.1f}x time)")
+
+
+def benchmark_snapshot(directory, pairs):
+    """
+    Compare startup time without (cold) and with (warm) a snapshot.
+    """
+    try:
+        os.remove(os.path.join(directory, degrees.SNAPSHOT))
+    except FileNotFoundError:
+        pass
+
+    reset()
+    start = time.perf_counter()
+    degrees.load_data(directory)
+    cold = time.perf_counter() - start
+
+    reset()
+    start = time.perf_counter()
+    degrees.load_data(directory)
+    warm = time.perf_counter() - start
+
+    print("Snapshot")
+    print(f"  cold: {cold:.3f}s")
+    print(f"  warm: {warm:.3f}s ({cold / warm:.1f}x)")
+
+
+def benchmark_distances(directory, pairs):
+    """
+    Compare one shortest_path call per target with a single
+    shortest_paths call and a full distances_from sweep.
+    """
+    source = pairs[0][0]
+    targets = [target for _, target in pairs]
+
+    start = time.perf_counter()
+    old_lengths = [len(path) if path is not None else None
+                   for path in (degrees.shortest_path(source, target)
+                                for target in targets)]
+    old = time.perf_counter() - start
+
+    start = time.perf_counter()
+    paths = degrees.shortest_paths(source, targets)
+    multi = time.perf_counter() - start
+    assert old_lengths == [len(paths[target]) if paths[target] is not None else None
+                           for target in targets]
+
+    start = time.perf_counter()
+    distances, _ = degrees.distances_from(source)
+    sweep = time.perf_counter() - start
+    assert old_lengths == [distances.get(target) for target in targets]
+
+    print(f"Distances ({len(targets)} targets, {len(distances)} reachable)")
+    print(f"  one search per target: {old:.3f}s")
+    print(f"  shortest_paths:        {multi:.3f}s ({old / multi:.1f}x)")
+    print(f"  distances_from:        {sweep:.3f}s")
+
+
+def person_expansion_distances(source):
+    """
+    Breadth-first search that expands each person into the set of
+    (movie, star) pairs of all their casts, as neighbors_for_person does.
+    """
+    graph = degrees.graph
+    distances = {source: 0}
+    queue = deque([source])
+    while queue:
+        person = queue.popleft()
+        neighbors = set()
+        for movie in graph.movies_for(person):
+            for star in graph.stars_for(movie):
+                neighbors.add((movie, star))
+        for _, star in neighbors:
+            if star not in distances:
+                distances[star] = distances[person] + 1
+                queue.append(star)
+    return distances
+
+
+def benchmark_movie_nodes(directory, pairs):
+    """
+    Compare full searches from the most prolific people with and without
+    treating movies as visited intermediate nodes.
+    """
+    graph = degrees.graph
+    offsets = graph.person_offsets
+    sources = sorted(
+        range(len(graph.person_ids)),
+        key=lambda person: offsets[person + 1] - offsets[person],
+        reverse=True
+    )[:5]
+
+    start = time.perf_counter()
+    old_distances = [person_expansion_distances(source) for source in sources]
+    old = time.perf_counter() - start
+
+    start = time.perf_counter()
+    new_distances = [degrees.breadth_first(source)[1] for source in sources]
+    new = time.perf_counter() - start
+    assert old_distances == new_distances
+
+    print(f"Movie nodes ({len(sources)} high-degree sources)")
+    print(f"  co-star sets: {old:.3f}s")
+    print(f"  movie nodes:  {new:.3f}s ({old / new:.1f}x)")
+
+
+def benchmark_landmarks(directory, pairs):
+    """
+    Report landmark index build time and size, check A* against plain
+    BFS, and compare their speed with landmark-only estimates.
+    """
+    try:
+        os.remove(os.path.join(directory, degrees.LANDMARKS))
+    except FileNotFoundError:
+        pass
+    start = time.perf_counter()
+    degrees.load_landmarks(directory)
+    build = time.perf_counter() - start
+    size = os.path.getsize(os.path.join(directory, degrees.LANDMARKS))
+
+    old, old_lengths = timed(degrees.shortest_path, pairs)
+    new, new_lengths = timed(degrees.landmark_shortest_path, pairs)
+    assert old_lengths == new_lengths
+
+    start = time.perf_counter()
+    for (source, target), length in zip(pairs, old_lengths):
+        lower, upper = degrees.estimate_degrees(source, target)
+        if length is not None:
+            assert lower <= length <= upper
+    estimate = time.perf_counter() - start
+
+    print(f"Landmarks ({degrees.LANDMARK_COUNT} landmarks, {len(pairs)} queries)")
+    print(f"  build: {build:.3f}s, {size / 2 ** 20:.1f} MiB")
+    print(f"  bfs:       {old:.3f}s")
+    print(f"  alt:       {new:.3f}s ({old / new:.1f}x)")
+    print(f"  estimates: {estimate:.6f}s ({old / estimate:.0f}x)")
+
+
+def peak_rss(load, directory, results):
+    """
+    Runs `load` in this (fresh) process, reporting its peak resident set
+    size in KiB through `results`.
+    """
+    load(directory)
+    # ru_maxrss survives exec on Linux, so it would include the parent's
+    # peak; the kernel's per-address-space high-water mark does not
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    results.put(int(line.split()[1]))
+                    return
+    except OSError:
+        pass
+    results.put(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+
+def measure_peak_rss(load, directory):
+    """
+    Returns the peak resident set size in KiB of a new process that only
+    runs `load`.
+    """
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=peak_rss, args=(load, directory, results))
+    process.start()
+    rss = results.get()
+    process.join()
+    return rss
+
+
+def benchmark_loader(directory, pairs):
+    """
+    Compare peak memory of the original and streaming loaders, and name
+    lookups in a dict of lowercased names and in the sorted name index.
+    """
+    old_rss = measure_peak_rss(legacy_load_data, directory)
+    new_rss = measure_peak_rss(degrees.load_csv, directory)
+
+    names, _, _ = legacy_load_data(directory)
+    queries = [degrees.person_name(source).upper() for source, _ in pairs]
+    start = time.perf_counter()
+    old_matches = [sorted(names.get(name.lower(), set())) for name in queries]
+    old = time.perf_counter() - start
+    start = time.perf_counter()
+    new_matches = [sorted(degrees.person_ids_for_name(name)) for name in queries]
+    new = time.perf_counter() - start
+    assert old_matches == new_matches
+
+    start = time.perf_counter()
+    for name in queries:
+        degrees.person_ids_for_prefix(name[:4], degrees.SUGGESTIONS)
+    prefix = time.perf_counter() - start
+
+    print(f"Loader ({len(queries)} name lookups)")
+    print(f"  dict of dicts: {old_rss / 1024:.1f} MiB peak RSS, {old:.6f}s lookups")
+    print(f"  streaming:     {new_rss / 1024:.1f} MiB peak RSS, {new:.6f}s lookups "
+          f"({old_rss / new_rss:.1f}x memory)")
+    print(f"  prefix lookups: {prefix:.6f}s")
+
+
+def benchmark_workers(directory, pairs):
+    """
+    Report batch throughput as the number of worker processes grows.
+    """
+    rows = [list(pair) for pair in sample_pairs(WORKER_QUERIES, seed=1)]
+    counts = sorted({1, 2, 4, os.cpu_count() or 1})
+
+    print(f"Workers ({len(rows)} queries)")
+    baseline = None
+    lengths = None
+    for workers in counts:
+        start = time.perf_counter()
+        responses = list(degrees.answer_all(rows, degrees.shortest_path, workers))
+        rate = len(rows) / (time.perf_counter() - start)
+        if lengths is None:
+            baseline = rate
+            lengths = [response["degrees"] for response in responses]
+        assert lengths == [response["degrees"] for response in responses]
+        print(f"  {workers:>2} workers: {rate:.1f} queries/s ({rate / baseline:.1f}x)")
+
+
+BENCHMARKS = {
+    "frontier": benchmark_frontiers,
+    "bidirectional": benchmark_bidirectional,
+    "csr": benchmark_csr,
+    "snapshot": benchmark_snapshot,
+    "distances": benchmark_distances,
+    "movie_nodes": benchmark_movie_nodes,
+    "landmarks": benchmark_landmarks,
+    "loader": benchmark_loader,
+    "workers": benchmark_workers,
+}
+
+
+if __name__ == "__main__":
+    main()
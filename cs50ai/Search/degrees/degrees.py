@@ -1,66 +1,234 @@
+import argparse
 import csv
+import gc
+import json
+import multiprocessing
+import os
+import pickle
 import sys
+from array import array
+from collections import deque
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
 
-from util import Node, StackFrontier, QueueFrontier
+from graph import Graph, UNKNOWN_YEAR
+from landmarks import LandmarkIndex
 
-# Maps names to a set of corresponding person_ids
-names = {}
+# People, movies, names and the person <-> movie adjacency
+graph = Graph()
 
-# Maps person_ids to a dictionary of: name, birth, movies (a set of movie_ids)
-people = {}
+# Binary snapshot written next to the CSV files; bump the version
+# whenever the layout of the saved data changes
+SNAPSHOT = "degrees.snapshot"
+SNAPSHOT_VERSION = 2
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
 
-# Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
-movies = {}
+# Optional landmark distance index, persisted next to the snapshot
+landmark_index = None
+LANDMARKS = "degrees.landmarks"
+LANDMARK_COUNT = 16
+
+# Most people offered when a name only matches as a prefix
+SUGGESTIONS = 10
+
+# Batch queries handed to a worker process at a time
+BATCH_CHUNK = 8
 
 
 def load_data(directory):
     """
-    Load data from CSV files into memory.
+    Load data into memory, reusing the directory's snapshot when the
+    CSV files haven't changed since it was written.
+    """
+    if not load_snapshot(directory):
+        load_csv(directory)
+        save_snapshot(directory)
+
+
+def load_csv(directory):
     """
+    Load data from CSV files into memory, streaming each row straight
+    into the graph's arrays.
+    """
+    global graph
+    graph = Graph()
+
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
+        reader = csv.reader(f)
+        id_, name, birth = columns(reader, "id", "name", "birth")
         for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
-                "movies": set()
-            }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
-            else:
-                names[row["name"].lower()].add(row["id"])
+            graph.add_person(row[id_], row[name], parse_year(row[birth]))
 
     # Load movies
     with open(f"{directory}/movies.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
+        reader = csv.reader(f)
+        id_, title, year = columns(reader, "id", "title", "year")
         for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
-                "stars": set()
-            }
+            graph.add_movie(row[id_], row[title], parse_year(row[year]))
 
     # Load stars
+    edge_people = array("i")
+    edge_movies = array("i")
+    person_index = graph.person_index
+    movie_index = graph.movie_index
     with open(f"{directory}/stars.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
+        reader = csv.reader(f)
+        person_id, movie_id = columns(reader, "person_id", "movie_id")
         for row in reader:
-            try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+            person = person_index.get(row[person_id])
+            movie = movie_index.get(row[movie_id])
+            if person is not None and movie is not None:
+                edge_people.append(person)
+                edge_movies.append(movie)
+    graph.build(edge_people, edge_movies)
+
+
+def columns(reader, *names):
+    """
+    Reads the header row from `reader`, returning the position of each
+    of the named columns.
+    """
+    header = next(reader)
+    return [header.index(name) for name in names]
+
+
+def parse_year(value):
+    """
+    Returns `value` as a year, or UNKNOWN_YEAR if it is not one.
+    """
+    return int(value) if value.isdigit() else UNKNOWN_YEAR
+
+
+def source_stamps(directory):
+    """
+    Returns the (name, mtime, size) of every CSV file in `directory`.
+    """
+    stamps = []
+    for name in SOURCES:
+        stat = os.stat(os.path.join(directory, name))
+        stamps.append((name, stat.st_mtime_ns, stat.st_size))
+    return stamps
+
+
+def load_snapshot(directory):
+    """
+    Replaces the loaded data with the directory's snapshot, returning
+    False if there is no usable snapshot for the current CSV files.
+    """
+    global graph
+    snapshot = read_pickle(os.path.join(directory, SNAPSHOT))
+    if (snapshot.get("version") != SNAPSHOT_VERSION
+            or snapshot.get("sources") != source_stamps(directory)):
+        return False
+    graph = snapshot["graph"]
+    return True
+
+
+def save_snapshot(directory):
+    """
+    Writes the loaded data to the directory's snapshot.
+    """
+    snapshot = {
+        "version": SNAPSHOT_VERSION,
+        "sources": source_stamps(directory),
+        "graph": graph
+    }
+    write_pickle(os.path.join(directory, SNAPSHOT), snapshot)
+
+
+def read_pickle(path):
+    """
+    Returns the dict pickled at `path`, or an empty dict if it can't be read.
+    """
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return {}
+
+
+def write_pickle(path, data):
+    """
+    Atomically pickles `data` to `path`. Failing to write a cache only
+    costs the next run a rebuild, so errors are ignored.
+    """
+    try:
+        with open(f"{path}.tmp", "wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(f"{path}.tmp", path)
+    except OSError:
+        pass
+
+
+def load_landmarks(directory, count=LANDMARK_COUNT):
+    """
+    Loads the directory's landmark index, rebuilding and saving it if it
+    is missing, stale or was built with a different landmark count.
+    """
+    global landmark_index
+    path = os.path.join(directory, LANDMARKS)
+    saved = read_pickle(path)
+    if (saved.get("version") == SNAPSHOT_VERSION
+            and saved.get("sources") == source_stamps(directory)
+            and saved.get("count") == count):
+        landmark_index = saved["index"]
+        return
+
+    landmark_index = LandmarkIndex.build(graph, count)
+    write_pickle(path, {
+        "version": SNAPSHOT_VERSION,
+        "sources": source_stamps(directory),
+        "count": count,
+        "index": landmark_index
+    })
 
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    parser = argparse.ArgumentParser()
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--bidirectional", action="store_true",
+                        help="search from both people at once")
+    parser.add_argument("--landmarks", action="store_true",
+                        help="search with A* guided by a landmark index")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="answer tab-separated name pairs read from FILE "
+                             "('-' for stdin) as JSON lines")
+    parser.add_argument("--workers", metavar="N", type=int, default=1,
+                        help="processes answering batch queries "
+                             "(0 for one per CPU, default: %(default)s)")
+    parser.add_argument("--serve", metavar="PORT", type=int,
+                        help="answer queries over HTTP on PORT")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="address to serve on (default: %(default)s)")
+    args = parser.parse_args()
+    if args.landmarks:
+        search = landmark_shortest_path
+    elif args.bidirectional:
+        search = bidirectional_shortest_path
+    else:
+        search = shortest_path
+
+    # Load data from files into memory, keeping stdout clean for batch results
+    status = sys.stderr if args.batch is not None else sys.stdout
+    print("Loading data...", file=status)
+    load_data(args.directory)
+    if args.landmarks:
+        load_landmarks(args.directory)
+    print("Data loaded.", file=status)
 
-    # Load data from files into memory
-    print("Loading data...")
-    load_data(directory)
-    print("Data loaded.")
+    workers = args.workers or None
+    if args.batch == "-":
+        run_batch(sys.stdin, sys.stdout, search, workers)
+        return
+    elif args.batch is not None:
+        with open(args.batch, encoding="utf-8") as f:
+            run_batch(f, sys.stdout, search, workers)
+        return
+    elif args.serve is not None:
+        serve(args.host, args.serve, search)
+        return
 
     source = person_id_for_name(input("Name: "))###id of the person
     if source is None:
@@ -69,7 +237,7 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    path = search(source, target)
 
     if path is None:
         print("Not connected.")
@@ -78,9 +246,9 @@ def main():
         print(f"{degrees} degrees of separation.")
         path = [(None, source)] + path
         for i in range(degrees):
-            person1 = people[path[i][1]]["name"]
-            person2 = people[path[i + 1][1]]["name"]
-            movie = movies[path[i + 1][0]]["title"]
+            person1 = person_name(path[i][1])
+            person2 = person_name(path[i + 1][1])
+            movie = movie_title(path[i + 1][0])
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
@@ -89,66 +257,386 @@ def shortest_path(source, target):
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
-    If no possible path, returns None.,,,,,source=person_id
-    """
-    start = Node(state=source, parent=None, action=None)
-    frontier = QueueFrontier()
-    frontier.add(start)
-    explored = set()
-    while not frontier.empty():
-        node = frontier.remove()
-        if node.state == target:
-            actions = []
-            cells = []
-            while node.parent is not None:
-                actions.append(node.action)
-                cells.append(node.state)
-                node = node.parent
-            actions.reverse()
-            cells.reverse()
-            solution = []
-            for i in range(len(actions)):
-                solution.append((actions[i], cells[i]))
-            return solution
-        explored.add(node.state)
-        for movie_id, person_id in neighbors_for_person(node.state):
-            if not frontier.contains_state(person_id) and person_id not in explored:
-                child = Node(state=person_id, parent=node, action=movie_id)
-                frontier.add(child)
+    If no possible path, returns None.
+    """
+    return shortest_paths(source, [target])[target]
+
+
+def shortest_paths(source, targets):
+    """
+    Returns a dict mapping each of `targets` to its shortest path from
+    the source, as returned by shortest_path, using a single search that
+    stops as soon as every target has been reached.
+    """
+    parents, _ = breadth_first(
+        graph.person_index[source],
+        {graph.person_index[target] for target in targets}
+    )
+    return {
+        target: (trace_path(parents, graph.person_index[target])
+                 if graph.person_index[target] in parents else None)
+        for target in targets
+    }
+
+
+def distances_from(source):
+    """
+    Searches outward from the source to every reachable person in one
+    pass. Returns (distances, parents), where distances maps each
+    reachable person_id to its degrees of separation from the source and
+    parents maps each of them except the source to the
+    (movie_id, person_id) step that reached it.
+    """
+    parents, distances = breadth_first(graph.person_index[source])
+    person_ids = graph.person_ids
+    movie_ids = graph.movie_ids
+    return (
+        {person_ids[person]: distance for person, distance in distances.items()},
+        {
+            person_ids[person]: (movie_ids[step[0]], person_ids[step[1]])
+            for person, step in parents.items() if step is not None
+        }
+    )
+
+
+def breadth_first(source, targets=None):
+    """
+    Breadth-first search over person indices from `source`, stopping
+    once every index in `targets` has been reached, or exhausting the
+    graph if `targets` is None. Returns (parents, distances), mapping
+    each reached person to the (movie, person) step that reached it and
+    to its distance from the source.
+    """
+    parents = {source: None}
+    distances = {source: 0}
+    remaining = None if targets is None else set(targets) - {source}
+    if remaining is not None and not remaining:
+        return parents, distances
+
+    # Movies are intermediate nodes: once one cast has been scanned,
+    # every star in it has been reached, so it is never scanned again
+    seen_movies = bytearray(len(graph.movie_ids))
+    queue = deque([source])
+    while queue:
+        person = queue.popleft()
+        distance = distances[person] + 1
+        for movie in graph.movies_for(person):
+            if seen_movies[movie]:
+                continue
+            seen_movies[movie] = 1
+            for star in graph.stars_for(movie):
+                if star in parents:
+                    continue
+                parents[star] = (movie, person)
+                distances[star] = distance
+                if remaining is not None and star in remaining:
+                    remaining.remove(star)
+                    if not remaining:
+                        return parents, distances
+                queue.append(star)
+    return parents, distances
+
+
+def landmark_shortest_path(source, target):
+    """
+    Returns the same path as shortest_path, found by an A* search that
+    uses the landmark index loaded by load_landmarks as its heuristic.
+    """
+    parents = landmark_index.shortest_path(
+        graph, graph.person_index[source], graph.person_index[target]
+    )
+    if parents is None:
+        return None
+    return trace_path(parents, graph.person_index[target])
+
+
+def estimate_degrees(source, target):
+    """
+    Returns (lower, upper) bounds on the degrees of separation between
+    two people from the landmark index alone. Unknown or disconnected
+    bounds are math.inf.
+    """
+    source = graph.person_index[source]
+    target = graph.person_index[target]
+    return (landmark_index.lower_bound(source, target),
+            landmark_index.upper_bound(source, target))
+
+
+def trace_path(parents, person):
+    """
+    Returns the (movie_id, person_id) pairs leading from the root of the
+    search that recorded `parents` to `person`.
+    """
+    return [
+        (graph.movie_ids[movie], graph.person_ids[star])
+        for movie, star, _ in reversed(walk(parents, person))
+    ]
+
+
+def bidirectional_shortest_path(source, target):
+    """
+    Returns the same kind of path as shortest_path, but grows one
+    breadth-first search from the source and another from the target,
+    always expanding whole layers of the smaller side, and splices the
+    two halves together where they meet.
+
+    If no possible path, returns None.
+    """
+    source = graph.person_index[source]
+    target = graph.person_index[target]
+    if source == target:
+        return []
+
+    # Maps each reached person to the (movie, person) step leading back
+    # towards the root of that side's search
+    forward = {source: None}
+    backward = {target: None}
+    forward_layer = [source]
+    backward_layer = [target]
+    forward_movies = bytearray(len(graph.movie_ids))
+    backward_movies = bytearray(len(graph.movie_ids))
+
+    while forward_layer and backward_layer:
+        if len(forward_layer) <= len(backward_layer):
+            forward_layer, meetings = expand_layer(
+                forward_layer, forward, backward, forward_movies
+            )
+        else:
+            backward_layer, meetings = expand_layer(
+                backward_layer, backward, forward, backward_movies
+            )
+        if meetings:
+            meeting = min(
+                meetings,
+                key=lambda person: (len(walk(forward, person))
+                                    + len(walk(backward, person)))
+            )
+            return splice_path(meeting, forward, backward)
     return None
 
 
+def expand_layer(layer, parents, other_parents, seen_movies):
+    """
+    Expands every person in `layer` through the movies not yet marked in
+    `seen_movies`, recording parents for newly reached people. Returns
+    the next layer and the people also reached by the other side of the
+    search.
+    """
+    next_layer = []
+    meetings = []
+    for person in layer:
+        for movie in graph.movies_for(person):
+            if seen_movies[movie]:
+                continue
+            seen_movies[movie] = 1
+            for star in graph.stars_for(movie):
+                if star in parents:
+                    continue
+                parents[star] = (movie, person)
+                next_layer.append(star)
+                if star in other_parents:
+                    meetings.append(star)
+    return next_layer, meetings
+
+
+def walk(parents, person):
+    """
+    Returns the (movie, person, parent) steps from `person` back to the
+    root of the search that recorded `parents`.
+    """
+    steps = []
+    while parents[person] is not None:
+        movie, parent = parents[person]
+        steps.append((movie, person, parent))
+        person = parent
+    return steps
+
+
+def splice_path(meeting, forward, backward):
+    """
+    Joins the forward and backward parent chains at `meeting` into a
+    list of (movie_id, person_id) pairs from source to target.
+    """
+    path = trace_path(forward, meeting)
+    path.extend(
+        (graph.movie_ids[movie], graph.person_ids[parent])
+        for movie, _, parent in walk(backward, meeting)
+    )
+    return path
+
+
+def answer(source_name, target_name, search=shortest_path):
+    """
+    Returns a JSON-serializable dict answering a query between two
+    people, each given by name or IMDb id.
+    """
+    response = {"source": source_name, "target": target_name}
+    source = lookup_person(source_name)
+    target = lookup_person(target_name)
+    if source is None or target is None:
+        response["error"] = "Person not found or ambiguous."
+        return response
+
+    path = search(source, target)
+    if path is None:
+        response["degrees"] = None
+        response["path"] = None
+    else:
+        response["degrees"] = len(path)
+        response["path"] = [
+            {
+                "movie_id": movie_id,
+                "movie": movie_title(movie_id),
+                "person_id": person_id,
+                "person": person_name(person_id)
+            }
+            for movie_id, person_id in path
+        ]
+    return response
+
+
+def lookup_person(name):
+    """
+    Returns the IMDB id for a person's name or id without prompting,
+    or None if it is unknown or ambiguous.
+    """
+    if name in graph.person_index:
+        return name
+    return person_id_for_name(name, interactive=False)
+
+
+def run_batch(lines, out, search=shortest_path, workers=1):
+    """
+    Answers each tab-separated "source<TAB>target" line of `lines`,
+    writing one JSON object per line to `out`, in order, as soon as it's
+    ready.
+    """
+    rows = (row for row in csv.reader(lines, delimiter="\t") if row)
+    for response in answer_all(rows, search, workers):
+        out.write(json.dumps(response) + "\n")
+        out.flush()
+
 
+def answer_all(rows, search=shortest_path, workers=1):
+    """
+    Yields the answer to each [source, target] row of `rows`, in order,
+    spread across `workers` processes (one per CPU if None).
 
+    Workers are forked after the data is loaded, so they read the graph
+    copy-on-write rather than each receiving a pickled copy.
+    """
+    respond = partial(answer_row, search=search)
+    if workers == 1 or "fork" not in multiprocessing.get_all_start_methods():
+        yield from map(respond, rows)
+        return
 
+    # Keep the collector from touching, and so copying, every loaded
+    # object in every worker
+    gc.freeze()
+    try:
+        with multiprocessing.get_context("fork").Pool(workers) as pool:
+            yield from pool.imap(respond, rows, chunksize=BATCH_CHUNK)
+    finally:
+        gc.unfreeze()
 
 
+def answer_row(row, search=shortest_path):
+    """
+    Returns answer() for a [source, target] row read from a batch.
+    """
+    if len(row) != 2:
+        return {"error": "Expected two tab-separated names."}
+    return answer(row[0].strip(), row[1].strip(), search)
 
 
-def person_id_for_name(name):
+class QueryHandler(BaseHTTPRequestHandler):
+    """
+    Answers GET /?source=NAME&target=NAME with the JSON from answer().
+    """
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        if "source" not in query or "target" not in query:
+            self.send_error(400, "Expected source and target parameters")
+            return
+        response = answer(query["source"][0], query["target"][0], self.server.search)
+        body = json.dumps(response).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve(host, port, search=shortest_path):
+    """
+    Answers queries over HTTP until interrupted. Each request runs on its
+    own thread against the data already loaded in memory.
+    """
+    server = ThreadingHTTPServer((host, port), QueryHandler)
+    server.search = search
+    print(f"Serving on http://{host}:{port}/?source=NAME&target=NAME")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def person_id_for_name(name, interactive=True):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
+
+    Names are matched ignoring case. If nobody has exactly that name,
+    people whose names start with it are offered instead. If
+    `interactive` is False, ambiguous names return None rather than
+    prompting for an id.
     """
-    person_ids = list(names.get(name.lower(), set()))
-    if len(person_ids) == 0:
-        return None
-    elif len(person_ids) > 1:
-        print(f"Which '{name}'?")
-        for person_id in person_ids:
-            person = people[person_id]
-            name = person["name"]
-            birth = person["birth"]
-            print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
-        try:
-            person_id = input("Intended Person ID: ")
-            if person_id in person_ids:
-                return person_id
-        except ValueError:
-            pass
-        return None
-    else:
+    person_ids = person_ids_for_name(name)
+    if len(person_ids) == 1:
         return person_ids[0]
+    elif len(person_ids) == 0 and interactive:
+        person_ids = person_ids_for_prefix(name, SUGGESTIONS)
+    if len(person_ids) == 0 or not interactive:
+        return None
+
+    print(f"Which '{name}'?")
+    for person_id in person_ids:
+        birth = graph.person_births[graph.person_index[person_id]]
+        birth = "" if birth == UNKNOWN_YEAR else birth
+        print(f"ID: {person_id}, Name: {person_name(person_id)}, Birth: {birth}")
+    try:
+        person_id = input("Intended Person ID: ")
+        if person_id in person_ids:
+            return person_id
+    except ValueError:
+        pass
+    return None
+
+
+def person_ids_for_name(name):
+    """
+    Returns the IMDB ids of everyone with a name, ignoring case.
+    """
+    return [graph.person_ids[person] for person in graph.names.find(name)]
+
+
+def person_ids_for_prefix(prefix, limit=None):
+    """
+    Returns the IMDB ids of up to `limit` people whose names start with
+    `prefix`, ignoring case, in name order.
+    """
+    return [graph.person_ids[person] for person in graph.names.prefix(prefix, limit)]
+
+
+def person_name(person_id):
+    return graph.person_names[graph.person_index[person_id]]
+
+
+def movie_title(movie_id):
+    return graph.movie_titles[graph.movie_index[movie_id]]
 
 
 def neighbors_for_person(person_id):
@@ -156,11 +644,10 @@ def neighbors_for_person(person_id):
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
-    movie_ids = people[person_id]["movies"]
     neighbors = set()
-    for movie_id in movie_ids:
-        for person_id in movies[movie_id]["stars"]:
-            neighbors.add((movie_id, person_id))
+    for movie in graph.movies_for(graph.person_index[person_id]):
+        for star in graph.stars_for(movie):
+            neighbors.add((graph.movie_ids[movie], graph.person_ids[star]))
     return neighbors
 
 
@@ -0,0 +1,171 @@
+from array import array
+from bisect import bisect_left
+
+# Stored for births and years that are missing or not a number
+UNKNOWN_YEAR = 0
+
+
+class Graph():
+    """
+    Person/movie graph with IMDb ids interned to dense integers,
+    per-person and per-movie fields stored in columnar arrays, and
+    adjacency stored in compressed sparse row (CSR) arrays.
+
+    The movies of person p are
+        person_movies[person_offsets[p]:person_offsets[p + 1]]
+    and the stars of movie m are
+        movie_stars[movie_offsets[m]:movie_offsets[m + 1]]
+    """
+
+    def __init__(self):
+        # Dense index -> IMDb id, and IMDb id -> dense index
+        self.person_ids = []
+        self.person_index = {}
+        self.movie_ids = []
+        self.movie_index = {}
+
+        # Columns indexed by dense index
+        self.person_names = []
+        self.person_births = array("H")
+        self.movie_titles = []
+        self.movie_years = array("H")
+        self.names = NameIndex(self.person_names)
+
+        self.person_offsets = array("i", [0])
+        self.person_movies = array("i")
+        self.movie_offsets = array("i", [0])
+        self.movie_stars = array("i")
+
+    def __getstate__(self):
+        # The id -> index maps are cheaper to rebuild than to unpickle
+        state = self.__dict__.copy()
+        del state["person_index"], state["movie_index"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.person_index = {
+            person_id: index for index, person_id in enumerate(self.person_ids)
+        }
+        self.movie_index = {
+            movie_id: index for index, movie_id in enumerate(self.movie_ids)
+        }
+
+    def add_person(self, person_id, name, birth=UNKNOWN_YEAR):
+        """
+        Interns `person_id`, returning its dense index. Repeated ids keep
+        their first name and birth year.
+        """
+        index = self.person_index.get(person_id)
+        if index is None:
+            index = len(self.person_ids)
+            self.person_index[person_id] = index
+            self.person_ids.append(person_id)
+            self.person_names.append(name)
+            self.person_births.append(birth)
+        return index
+
+    def add_movie(self, movie_id, title, year=UNKNOWN_YEAR):
+        """
+        Interns `movie_id`, returning its dense index. Repeated ids keep
+        their first title and year.
+        """
+        index = self.movie_index.get(movie_id)
+        if index is None:
+            index = len(self.movie_ids)
+            self.movie_index[movie_id] = index
+            self.movie_ids.append(movie_id)
+            self.movie_titles.append(title)
+            self.movie_years.append(year)
+        return index
+
+    def build(self, edge_people, edge_movies):
+        """
+        Builds both adjacencies from parallel arrays holding the person
+        and movie index of every starring role, and the name index.
+        """
+        self.person_offsets, self.person_movies = compress(
+            len(self.person_ids), edge_people, edge_movies
+        )
+        self.movie_offsets, self.movie_stars = compress(
+            len(self.movie_ids), edge_movies, edge_people
+        )
+        self.names = NameIndex(self.person_names)
+
+    def movies_for(self, person):
+        """
+        Returns the indices of the movies `person` starred in.
+        """
+        offsets = self.person_offsets
+        return self.person_movies[offsets[person]:offsets[person + 1]]
+
+    def stars_for(self, movie):
+        """
+        Returns the indices of the people who starred in `movie`.
+        """
+        offsets = self.movie_offsets
+        return self.movie_stars[offsets[movie]:offsets[movie + 1]]
+
+
+class NameIndex():
+    """
+    Case-insensitive lookup of people by name or name prefix. People are
+    kept sorted by lowercased name, so both are a binary search away.
+    """
+
+    def __init__(self, names):
+        self.person_names = names
+        self.people = array("i", sorted(
+            range(len(names)), key=lambda person: names[person].lower()
+        ))
+
+    def key(self, person):
+        return self.person_names[person].lower()
+
+    def find(self, name):
+        """
+        Returns the indices of the people named `name`, ignoring case.
+        """
+        name = name.lower()
+        start = bisect_left(self.people, name, key=self.key)
+        matches = []
+        for position in range(start, len(self.people)):
+            person = self.people[position]
+            if self.key(person) != name:
+                break
+            matches.append(person)
+        return matches
+
+    def prefix(self, prefix, limit=None):
+        """
+        Returns the indices of up to `limit` people whose names start with
+        `prefix`, ignoring case, in name order.
+        """
+        prefix = prefix.lower()
+        start = bisect_left(self.people, prefix, key=self.key)
+        matches = []
+        for position in range(start, len(self.people)):
+            person = self.people[position]
+            if len(matches) == limit or not self.key(person).startswith(prefix):
+                break
+            matches.append(person)
+        return matches
+
+
+def compress(rows, sources, targets):
+    """
+    Counting-sorts the edges (sources[i], targets[i]) by source, returning
+    the (offsets, adjacency) arrays of a CSR matrix with `rows` rows.
+    """
+    offsets = array("i", [0]) * (rows + 1)
+    for source in sources:
+        offsets[source + 1] += 1
+    for row in range(rows):
+        offsets[row + 1] += offsets[row]
+
+    adjacency = array("i", [0]) * len(targets)
+    position = offsets[:-1]
+    for source, target in zip(sources, targets):
+        adjacency[position[source]] = target
+        position[source] += 1
+    return offsets, adjacency
@@ -0,0 +1,211 @@
+import heapq
+import math
+from array import array
+from collections import deque
+
+# Distance recorded for people a landmark cannot reach
+UNREACHABLE = 0xFFFF
+
+# Number of landmarks consulted by each A* search
+ACTIVE_LANDMARKS = 4
+
+
+class LandmarkIndex():
+    """
+    Degrees of separation from a few well-connected landmark people to
+    everyone else. By the triangle inequality these bound the distance
+    between any two people without searching the graph.
+    """
+
+    def __init__(self, landmarks, distances):
+        # Person indices of the landmarks, and for each landmark an
+        # array of its distance to every person
+        self.landmarks = landmarks
+        self.distances = distances
+
+    @classmethod
+    def build(cls, graph, count=16):
+        """
+        Picks the `count` people with the most co-star roles as
+        landmarks and records their distance to everyone.
+        """
+        person_offsets = graph.person_offsets
+        movie_offsets = graph.movie_offsets
+
+        def costars(person):
+            return sum(
+                movie_offsets[movie + 1] - movie_offsets[movie]
+                for movie in graph.movies_for(person)
+            )
+
+        people = range(len(graph.person_ids))
+        landmarks = sorted(
+            (person for person in people
+             if person_offsets[person + 1] > person_offsets[person]),
+            key=costars, reverse=True
+        )[:count]
+        return cls(landmarks, [distances_from(graph, person) for person in landmarks])
+
+    def lower_bound(self, a, b):
+        """
+        Returns a lower bound on the distance between people `a` and `b`,
+        or math.inf if a landmark proves they are not connected.
+        """
+        bound = 0
+        for distances in self.distances:
+            da = distances[a]
+            db = distances[b]
+            if da == UNREACHABLE and db == UNREACHABLE:
+                continue
+            if da == UNREACHABLE or db == UNREACHABLE:
+                return math.inf
+            bound = max(bound, abs(da - db))
+        return bound
+
+    def upper_bound(self, a, b):
+        """
+        Returns an upper bound on the distance between people `a` and `b`
+        via the best landmark, or math.inf if no landmark reaches both.
+        """
+        bound = math.inf
+        for distances in self.distances:
+            da = distances[a]
+            db = distances[b]
+            if da != UNREACHABLE and db != UNREACHABLE:
+                bound = min(bound, da + db)
+        return bound
+
+    def shortest_path(self, graph, source, target):
+        """
+        A* search from person `source` to person `target`, guided by the
+        landmark lower bounds (ALT). Returns a dict mapping each reached
+        person to the (movie, person) step that reached it, or None if
+        the people are not connected.
+        """
+        parents = {source: None}
+        if source == target:
+            return parents
+        if self.lower_bound(source, target) == math.inf:
+            return None
+
+        # Only landmarks that reach the target say anything about it, and
+        # they reach everyone connected to the source as well
+        landmarks = [
+            (distances, distances[target]) for distances in self.distances
+            if distances[target] != UNREACHABLE
+        ]
+
+        # The best route through a landmark is a path of known length, so
+        # the search only has to look for strictly shorter ones
+        limit = math.inf
+        if landmarks:
+            via, to_target = min(
+                landmarks,
+                key=lambda landmark: landmark[0][source] + landmark[1]
+            )
+            limit = via[source] + to_target
+
+        # Estimating with just the few landmarks that bound this query
+        # best keeps each estimate cheap
+        landmarks.sort(
+            key=lambda landmark: abs(landmark[0][source] - landmark[1]),
+            reverse=True
+        )
+        del landmarks[ACTIVE_LANDMARKS:]
+
+        def estimate(person):
+            return max((abs(distances[person] - to_target)
+                        for distances, to_target in landmarks), default=0)
+
+        # Best known distance to each person, and the distance from which
+        # each movie's cast was last scanned. The heuristic is consistent
+        # but A* does not settle people in order of distance, so a cast
+        # is rescanned whenever it is reached by a shorter route. Ties
+        # in the queue go to the deepest person.
+        costs = {source: 0}
+        scanned = {}
+        frontier = [(estimate(source), 0, source)]
+        while frontier:
+            bound, cost, person = heapq.heappop(frontier)
+            cost = -cost
+            if person == target:
+                return parents
+            if cost > costs[person]:
+                continue
+            for movie in graph.movies_for(person):
+                if scanned.get(movie, math.inf) <= cost:
+                    continue
+                scanned[movie] = cost
+                for star in graph.stars_for(movie):
+                    if cost + 1 >= costs.get(star, math.inf):
+                        continue
+                    costs[star] = cost + 1
+                    parents[star] = (movie, person)
+                    # No path can be shorter than the smallest estimate
+                    # still queued, so reaching the target at that
+                    # distance settles it
+                    if star == target and cost + 1 <= bound:
+                        return parents
+                    total = cost + 1 + estimate(star)
+                    if total < limit:
+                        heapq.heappush(frontier, (total, -cost - 1, star))
+
+        if limit == math.inf:
+            return None
+        return route(graph, via, source, target)
+
+
+def route(graph, distances, source, target):
+    """
+    Returns a parents dict, as from LandmarkIndex.shortest_path, for a
+    path from `source` to `target` through the landmark that recorded
+    `distances`, found by stepping down its distances from each end.
+    """
+    def descend(person):
+        steps = []
+        while distances[person] > 0:
+            steps.append(next(
+                (movie, star)
+                for movie in graph.movies_for(person)
+                for star in graph.stars_for(movie)
+                if distances[star] == distances[person] - 1
+            ))
+            person = steps[-1][1]
+        return steps
+
+    # Source -> landmark reverses the descent from the source
+    parents = {source: None}
+    person = source
+    for movie, star in descend(source):
+        parents[star] = (movie, person)
+        person = star
+
+    # Landmark -> target reverses the descent from the target
+    steps = descend(target)
+    people = [target] + [star for _, star in steps]
+    for (movie, _), child, parent in zip(steps, people, people[1:]):
+        parents[child] = (movie, parent)
+    return parents
+
+
+def distances_from(graph, source):
+    """
+    Returns an array of the distance from person `source` to every
+    person, holding UNREACHABLE for people it cannot reach.
+    """
+    distances = array("H", [UNREACHABLE]) * len(graph.person_ids)
+    distances[source] = 0
+    seen_movies = bytearray(len(graph.movie_ids))
+    queue = deque([source])
+    while queue:
+        person = queue.popleft()
+        distance = distances[person] + 1
+        for movie in graph.movies_for(person):
+            if seen_movies[movie]:
+                continue
+            seen_movies[movie] = 1
+            for star in graph.stars_for(movie):
+                if distances[star] == UNREACHABLE:
+                    distances[star] = distance
+                    queue.append(star)
+    return distances
@@ -0,0 +1,111 @@
+import time
+
+import bitboard
+import book
+import tictactoe as ttt
+
+
+def main():
+    benchmark_transpositions()
+    benchmark_bitboard()
+    benchmark_book()
+
+
+def searched(board, engine=ttt):
+    """
+    Returns (action, positions visited, seconds) for one minimax call,
+    made without the opening book so that the search itself is measured.
+    """
+    table = ttt.book
+    ttt.book = None
+    engine.nodes = 0
+    try:
+        start = time.perf_counter()
+        action = engine.minimax(board)
+        return action, engine.nodes, time.perf_counter() - start
+    finally:
+        ttt.book = table
+
+
+def benchmark_transpositions():
+    """
+    Count the positions searched for the first move from the empty board
+    without a transposition table, with an empty one, and once it has
+    been filled by an earlier game.
+    """
+    board = ttt.initial_state()
+
+    table = ttt.transpositions
+    ttt.transpositions = ttt.NoTable()
+    try:
+        _, plain, plain_time = searched(board)
+    finally:
+        ttt.transpositions = table
+
+    ttt.transpositions.clear()
+    _, cold, cold_time = searched(board)
+    _, warm, warm_time = searched(board)
+
+    print("First move from the empty board")
+    print(f"  no table:   {plain:>6} positions, {plain_time:.4f}s")
+    print(f"  cold table: {cold:>6} positions, {cold_time:.4f}s")
+    print(f"  warm table: {warm:>6} positions, {warm_time:.4f}s "
+          f"({len(ttt.transpositions)} entries)")
+
+
+def benchmark_bitboard():
+    """
+    Compare positions searched per second by the list-of-lists and
+    bitboard engines, both without a transposition table.
+    """
+    board = ttt.initial_state()
+
+    table = ttt.transpositions
+    ttt.transpositions = ttt.NoTable()
+    try:
+        _, lists, lists_time = searched(board)
+    finally:
+        ttt.transpositions = table
+    _, bits, bits_time = searched(board, bitboard)
+
+    lists_rate = lists / lists_time
+    bits_rate = bits / bits_time
+    print("Positions per second, first move from the empty board")
+    print(f"  lists:     {lists_rate:>10.0f} ({lists} positions)")
+    print(f"  bitboards: {bits_rate:>10.0f} ({bits} positions, "
+          f"{bits_rate / lists_rate:.1f}x)")
+
+
+def benchmark_book():
+    """
+    Compare the time to choose a move for every non-terminal position
+    reachable from the empty board with and without the opening book.
+    """
+    if ttt.book is None:
+        print("No opening book, run book.py to build it")
+        return
+    boards = [book.decode(key) for key, (_, action)
+              in book.solve(ttt.initial_state(), {}).items()
+              if action is not None]
+
+    def timed():
+        ttt.transpositions.clear()
+        start = time.perf_counter()
+        for board in boards:
+            ttt.minimax(board)
+        return (time.perf_counter() - start) / len(boards)
+
+    booked = timed()
+    table, ttt.book = ttt.book, None
+    try:
+        live = timed()
+    finally:
+        ttt.book = table
+
+    print(f"Mean time per move over {len(boards)} positions")
+    print(f"  search: {live * 1e6:>8.1f}us")
+    print(f"  book:   {booked * 1e6:>8.1f}us ({live / booked:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
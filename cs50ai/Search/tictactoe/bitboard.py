@@ -0,0 +1,159 @@
+"""
+Tic Tac Toe Player on bitboards
+
+A position is a pair of 9-bit integers, one per player, with bit
+3 * i + j set when that player holds cell (i, j). Making a move is a
+single OR that leaves the parent position untouched, so undoing it is
+free. The list-of-lists functions below adapt boards from tictactoe.py
+to this representation, so this module can stand in for it.
+"""
+
+import math
+
+import tictactoe as ttt
+
+X = ttt.X
+O = ttt.O
+EMPTY = ttt.EMPTY
+
+FULL = 0b111111111
+
+# Rows, columns and diagonals
+WIN_MASKS = (
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100,
+)
+
+# WINNING[bits] is true if the cells in `bits` contain a full line
+WINNING = bytes(
+    any(bits & mask == mask for mask in WIN_MASKS) for bits in range(FULL + 1)
+)
+
+# Cells in the order they are searched: center, corners, then edges
+ORDER = (4, 0, 2, 6, 8, 1, 3, 5, 7)
+
+# Number of positions visited by negamax
+nodes = 0
+
+
+def encode(board):
+    """
+    Returns the (x, o) bitboards for a list-of-lists board.
+    """
+    x = o = 0
+    for i in range(3):
+        for j in range(3):
+            if board[i][j] == X:
+                x |= 1 << (3 * i + j)
+            elif board[i][j] == O:
+                o |= 1 << (3 * i + j)
+    return x, o
+
+
+def negamax(us, them, alpha, beta):
+    """
+    Returns the value of the position for the player to move, who holds
+    `us`, given that the opponent, holding `them`, has just moved:
+    1 for a win, -1 for a loss and 0 for a draw.
+    """
+    global nodes
+    nodes += 1
+    if WINNING[them]:
+        return -1
+    occupied = us | them
+    if occupied == FULL:
+        return 0
+
+    value = -math.inf
+    for cell in ORDER:
+        move = 1 << cell
+        if occupied & move:
+            continue
+        value = max(value, -negamax(them, us | move, -beta, -alpha))
+        alpha = max(alpha, value)
+        if alpha >= beta:
+            break
+    return value
+
+
+def initial_state():
+    """
+    Returns starting state of the board.
+    """
+    return ttt.initial_state()
+
+
+def player(board):
+    """
+    Returns player who has the next turn on a board.
+    """
+    x, o = encode(board)
+    return X if x.bit_count() == o.bit_count() else O
+
+
+def actions(board):
+    """
+    Returns set of all possible actions (i, j) available on the board.
+    """
+    x, o = encode(board)
+    return {divmod(cell, 3) for cell in range(9) if not (x | o) & (1 << cell)}
+
+
+def result(board, action):
+    """
+    Returns the board that results from making move (i, j) on the board.
+    """
+    return ttt.result(board, action)
+
+
+def winner(board):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    x, o = encode(board)
+    if WINNING[x]:
+        return X
+    if WINNING[o]:
+        return O
+    return None
+
+
+def terminal(board):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    x, o = encode(board)
+    return bool(WINNING[x] or WINNING[o]) or x | o == FULL
+
+
+def utility(board):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    x, o = encode(board)
+    return 1 if WINNING[x] else -1 if WINNING[o] else 0
+
+
+def minimax(board):
+    """
+    Returns the optimal action for the current player on the board.
+    """
+    x, o = encode(board)
+    if WINNING[x] or WINNING[o] or x | o == FULL:
+        return None
+    us, them = (x, o) if x.bit_count() == o.bit_count() else (o, x)
+
+    best_value = -math.inf
+    best_cell = None
+    alpha = -math.inf
+    for cell in ORDER:
+        move = 1 << cell
+        if (us | them) & move:
+            continue
+        value = -negamax(them, us | move, -math.inf, -alpha)
+        if value > best_value:
+            best_value = value
+            best_cell = cell
+        alpha = max(alpha, value)
+    return divmod(best_cell, 3)
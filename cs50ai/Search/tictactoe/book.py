@@ -0,0 +1,127 @@
+"""
+Builds the opening book for 3x3 tic tac toe
+
+Every position reachable from the empty board is solved exactly once,
+and the best action for each is written to book.bin as one byte per
+base-3 board encoding (see tictactoe.encode), so minimax can play the
+standard game with a single table lookup. The book is then checked
+against the live alpha-beta search.
+
+Usage: python book.py
+"""
+
+import math
+import sys
+import time
+
+import tictactoe as ttt
+from bitboard import ORDER
+
+
+def main():
+    start = time.perf_counter()
+    solved = solve(ttt.initial_state(), {})
+    table = build(solved)
+    with open(ttt.BOOK, "wb") as f:
+        f.write(table)
+    entries = len(table) - table.count(ttt.NO_MOVE)
+    print(f"Solved {len(solved)} positions, wrote {entries} entries "
+          f"({len(table)} bytes) in {time.perf_counter() - start:.2f}s")
+
+    ttt.book = table
+    mismatches = validate(solved)
+    if mismatches:
+        sys.exit(f"{mismatches} positions disagree with the live search")
+    print("Book agrees with the live search on every position")
+
+
+def solve(board, solved):
+    """
+    Fills `solved` with (score, action) for every position reachable
+    from `board`, keyed by encoding, and returns it. Scores are from X's
+    point of view and prefer quicker wins and slower losses: a win with
+    n empty cells left scores n + 1. Terminal positions have no action.
+    """
+    key = ttt.encode(board)
+    if key in solved:
+        return solved
+    if ttt.terminal(board):
+        empty = sum(row.count(ttt.EMPTY) for row in board)
+        solved[key] = (ttt.utility(board) * (empty + 1), None)
+        return solved
+
+    maximizing = ttt.player(board) == ttt.X
+    best = (-math.inf if maximizing else math.inf), None
+    # Ties between equally good actions go to the first in search order
+    for cell in ORDER:
+        action = divmod(cell, 3)
+        if board[action[0]][action[1]] != ttt.EMPTY:
+            continue
+        child = ttt.result(board, action)
+        score = solve(child, solved)[ttt.encode(child)][0]
+        if score > best[0] if maximizing else score < best[0]:
+            best = score, action
+    solved[key] = best
+    return solved
+
+
+def build(solved):
+    """
+    Returns the book's bytes for the positions in `solved`.
+    """
+    table = bytearray([ttt.NO_MOVE]) * 3 ** 9
+    for key, (score, action) in solved.items():
+        if action is not None:
+            value = (score > 0) - (score < 0)
+            table[key] = (value + 1) << 4 | (3 * action[0] + action[1])
+    return bytes(table)
+
+
+def decode(key):
+    """
+    Returns the board with base-3 encoding `key`.
+    """
+    cells = []
+    for _ in range(9):
+        key, digit = divmod(key, 3)
+        cells.append((ttt.EMPTY, ttt.X, ttt.O)[digit])
+    cells.reverse()
+    return [cells[0:3], cells[3:6], cells[6:9]]
+
+
+def validate(solved):
+    """
+    Returns the number of non-terminal positions whose book entry
+    disagrees with the live search: either the stored value differs from
+    the position's minimax value, or the book action is worse than the
+    action the search picks.
+    """
+    book, ttt.book = ttt.book, None
+    try:
+        mismatches = 0
+        for key, (_, action) in solved.items():
+            if action is None:
+                continue
+            board = decode(key)
+            entry = book[key]
+            value = (entry >> 4) - 1
+            booked = value_of(ttt.result(board, divmod(entry & 0x0F, 3)))
+            searched = value_of(ttt.result(board, ttt.minimax(board)))
+            if not value == booked == searched:
+                mismatches += 1
+        return mismatches
+    finally:
+        ttt.book = book
+
+
+def value_of(board):
+    """
+    Returns the minimax value of `board` according to the live search.
+    """
+    if ttt.player(board) == ttt.X:
+        return ttt.max_value(board, -math.inf, math.inf)
+    return ttt.min_value(board, -math.inf, math.inf)
+
+
+if __name__ == "__main__":
+    main()
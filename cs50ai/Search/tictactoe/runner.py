@@ -1,9 +1,20 @@
 import pygame
 import sys
+import threading
 import time
 
 import tictactoe as ttt
 
+# Board shape, win length and seconds the AI may think per move:
+# python runner.py [rows cols k [seconds]]
+if len(sys.argv) not in (1, 4, 5):
+    sys.exit("Usage: python runner.py [rows cols k [seconds]]")
+if len(sys.argv) > 1:
+    ROWS, COLS, K = (int(arg) for arg in sys.argv[1:4])
+else:
+    ROWS, COLS, K = 3, 3, 3
+TIME_LIMIT = float(sys.argv[4]) if len(sys.argv) == 5 else ttt.TIME_LIMIT
+
 pygame.init()
 size = width, height = 600, 400
 
@@ -15,11 +26,46 @@ screen = pygame.display.set_mode(size)
 
 mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
 largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
-moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
+
+# Fit the board between the title and the bottom button
+tile_size = int(min(80, (width - 40) / COLS, (height - 140) / ROWS))
+moveFont = pygame.font.Font("OpenSans-Regular.ttf", int(tile_size * 0.75))
+
+# Frames drawn per second, and the least time the AI appears to think
+FPS = 30
+THINK_TIME = 0.5
+
+clock = pygame.time.Clock()
 
 user = None
-board = ttt.initial_state()
-ai_turn = False
+board = ttt.initial_state(ROWS, COLS)
+
+# The AI searches on a worker thread so the window keeps drawing and
+# handling events meanwhile. `search` is (start time, outcome, cancel,
+# thread) for the search in flight, whose thread puts its move, or the
+# error it raised, in the outcome dict; resetting the game cancels it.
+search = None
+
+
+def think(board, outcome, cancel):
+    try:
+        outcome["move"] = ttt.minimax(board, K, TIME_LIMIT, cancel)
+    except ttt.Timeout:
+        pass
+    except Exception as error:
+        outcome["error"] = error
+
+
+def cancel_search(search):
+    """
+    Stops the search in flight, if any, and waits for its thread to end
+    so that it never runs alongside the next game's search.
+    """
+    if search is not None:
+        _, _, cancel, thread = search
+        cancel.set()
+        thread.join()
+
 
 while True:
 
@@ -27,6 +73,13 @@ while True:
         if event.type == pygame.QUIT:
             sys.exit()
 
+        # Escape abandons the game, and any search in flight, for a new one
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+            user = None
+            board = ttt.initial_state(ROWS, COLS)
+            cancel_search(search)
+            search = None
+
     screen.fill(black)
 
     # Let user choose a player.
@@ -67,13 +120,12 @@ while True:
     else:
 
         # Draw game board
-        tile_size = 80
-        tile_origin = (width / 2 - (1.5 * tile_size),
-                       height / 2 - (1.5 * tile_size))
+        tile_origin = (width / 2 - (COLS / 2 * tile_size),
+                       height / 2 - (ROWS / 2 * tile_size))
         tiles = []
-        for i in range(3):
+        for i in range(ROWS):
             row = []
-            for j in range(3):
+            for j in range(COLS):
                 rect = pygame.Rect(
                     tile_origin[0] + j * tile_size,
                     tile_origin[1] + i * tile_size,
@@ -89,12 +141,12 @@ while True:
                 row.append(rect)
             tiles.append(row)
 
-        game_over = ttt.terminal(board)
+        game_over = ttt.terminal(board, K)
         player = ttt.player(board)
 
         # Show title
         if game_over:
-            winner = ttt.winner(board)
+            winner = ttt.winner(board, K)
             if winner is None:
                 title = f"Game Over: Tie."
             else:
@@ -102,7 +154,8 @@ while True:
         elif user == player:
             title = f"Play as {user}"
         else:
-            title = f"Computer thinking..."
+            dots = int(time.monotonic() * 2) % 3 + 1
+            title = "Computer thinking" + "." * dots
         title = largeFont.render(title, True, white)
         titleRect = title.get_rect()
         titleRect.center = ((width / 2), 30)
@@ -110,20 +163,26 @@ while True:
 
         # Check for AI move
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+            if search is None:
+                outcome, cancel = {}, threading.Event()
+                thread = threading.Thread(
+                    target=think, args=(board, outcome, cancel), daemon=True
+                )
+                search = time.monotonic(), outcome, cancel, thread
+                thread.start()
+            elif "error" in search[1]:
+                raise search[1]["error"]
+            elif ("move" in search[1]
+                  and time.monotonic() - search[0] >= THINK_TIME):
+                board = ttt.result(board, search[1]["move"])
+                search = None
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
         if click == 1 and user == player and not game_over:
             mouse = pygame.mouse.get_pos()
-            for i in range(3):
-                for j in range(3):
+            for i in range(ROWS):
+                for j in range(COLS):
                     if (board[i][j] == ttt.EMPTY and tiles[i][j].collidepoint(mouse)):
                         board = ttt.result(board, (i, j))
 
@@ -140,7 +199,9 @@ while True:
                 if againButton.collidepoint(mouse):
                     time.sleep(0.2)
                     user = None
-                    board = ttt.initial_state()
-                    ai_turn = False
+                    board = ttt.initial_state(ROWS, COLS)
+                    cancel_search(search)
+                    search = None
 
     pygame.display.flip()
+    clock.tick(FPS)
@@ -1 +1,71 @@
-print(sorted([(0, 0), (0, 1), (0, 2), (1, 1), (1, 2), (2, 0), (2, 1), (2, 2)]))
\ No newline at end of file
+"""
+Checks minimax against an exhaustive search without pruning
+
+For every non-terminal position reachable from the empty board, the
+action chosen by the alpha-beta search must be worth exactly as much as
+the position's exhaustive minimax value. The number of positions each
+search visits for the opening move is printed alongside.
+
+Usage: python test.py
+"""
+
+import tictactoe as ttt
+from book import decode
+
+# Number of positions visited by exhaustive()
+visited = 0
+
+
+def exhaustive(board, values):
+    """
+    Returns the minimax value of the board for X, searching every
+    continuation, and records the value of every position in `values`.
+    """
+    global visited
+    visited += 1
+    key = ttt.encode(board)
+    if ttt.terminal(board):
+        values[key] = ttt.utility(board)
+        return values[key]
+    scores = [exhaustive(ttt.result(board, action), values)
+              for action in ttt.actions(board)]
+    values[key] = max(scores) if ttt.player(board) == ttt.X else min(scores)
+    return values[key]
+
+
+def main():
+    board = ttt.initial_state()
+    values = {}
+    exhaustive(board, values)
+    full = visited
+
+    # Without the transposition table, then with an empty one
+    ttt.book = None
+    ttt.transpositions = ttt.NoTable()
+    ttt.nodes = 0
+    ttt.minimax(board)
+    pruned = ttt.nodes
+    ttt.transpositions = {}
+    ttt.nodes = 0
+    ttt.minimax(board)
+    cached = ttt.nodes
+
+    checked = mismatches = 0
+    for key, value in values.items():
+        position = decode(key)
+        if ttt.terminal(position):
+            continue
+        action = ttt.minimax(position)
+        checked += 1
+        if values[ttt.encode(ttt.result(position, action))] != value:
+            mismatches += 1
+
+    print(f"Positions visited for the opening move: {full} exhaustive, "
+          f"{pruned} alpha-beta, {cached} with transpositions")
+    assert not mismatches, f"{mismatches} positions played suboptimally"
+    assert pruned * 10 < full, "alpha-beta visited too many positions"
+    print(f"All {checked} positions played optimally")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,98 @@
 """
 Tic Tac Toe Player
+
+Boards may be any size, and a player wins by claiming k cells in a row,
+column or diagonal. Boards of up to EXACT_CELLS cells are solved exactly
+by minimax; larger ones are searched by iterative deepening within a
+time limit.
 """
 
 import math
+import os
+import time
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# Boards with at most this many cells are solved exactly
+EXACT_CELLS = 9
+
+# Seconds the iterative deepening search may spend on a move by default
+TIME_LIMIT = 1.0
+
+# Score for a win found by the depth-limited search, less the number of
+# moves needed to reach it so that faster wins score higher, and for a
+# win the heuristic evaluation expects but the search hasn't proven
+WIN_SCORE = 10 ** 9
+THREAT_SCORE = 10 ** 8
+
+# Transposition table shared across moves and games, mapping a
+# canonical board key to (value, bound), where bound says whether the
+# value is exact or only a lower or upper bound on the true value
+EXACT, LOWER, UPPER = 0, 1, -1
+transpositions = {}
+
+# Number of positions visited by the searches
+nodes = 0
+
+# Caches of lines, symmetries and exact search move orders per board shape
+LINES = {}
+SYMMETRIES = {}
+ORDERS = {}
+
+# Perfect-play table for the 3x3 game written by book.py: one byte per
+# base-3 board encoding, holding (value + 1) << 4 | (3 * i + j) for the
+# best action (i, j), or NO_MOVE for terminal and unreachable boards
+BOOK = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+NO_MOVE = 0xFF
+
 
-def initial_state():
+class NoTable(dict):
+    """
+    A transposition table that never remembers anything, for measuring
+    the search without one.
+    """
+
+    def __setitem__(self, key, value):
+        pass
+
+
+class Timeout(Exception):
+    """
+    Raised inside a search once its deadline has passed or it has been
+    cancelled.
+    """
+
+
+def load_book(path=BOOK):
+    """
+    Returns the opening book's contents, or None if it hasn't been built.
+    """
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+book = load_book()
+
+
+def initial_state(rows=3, cols=3):
     """
     Returns starting state of the board.
     """
-    return [[EMPTY, EMPTY, EMPTY],
-            [EMPTY, EMPTY, EMPTY],
-            [EMPTY, EMPTY, EMPTY]]
+    return [[EMPTY] * cols for _ in range(rows)]
 
 
 def player(board):
     """
     Returns player who has the next turn on a board.
     """
-    return X if sum(row.count(EMPTY) for row in board) % 2 == 1 else O
+    xs = sum(row.count(X) for row in board)
+    noughts = sum(row.count(O) for row in board)
+    return X if xs == noughts else O
 
 
 def actions(board):
@@ -30,8 +100,8 @@ def actions(board):
     Returns set of all possible actions (i, j) available on the board.
     """
     available_actions = set()
-    for row in range(3):
-        for col in range(3):
+    for row in range(len(board)):
+        for col in range(len(board[row])):
             if board[row][col] == EMPTY:
                 available_actions.add((row, col))
     return available_actions
@@ -47,109 +117,457 @@ def result(board, action):
     return copy_board
 
 
+def win_length(board, k=None):
+    """
+    Returns k, the number of cells in a line needed to win, defaulting
+    to the board's shorter side, up to five.
+    """
+    if k is not None:
+        return k
+    return min(len(board), len(board[0]), 5)
 
-def winner(board):
+
+def lines(rows, cols, k):
+    """
+    Returns every line of k cells on a rows x cols board.
+    """
+    if (rows, cols, k) not in LINES:
+        found = []
+        for i in range(rows):
+            for j in range(cols):
+                for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    line = [(i + n * di, j + n * dj) for n in range(k)]
+                    if all(0 <= a < rows and 0 <= b < cols for a, b in line):
+                        found.append(line)
+        LINES[(rows, cols, k)] = found
+    return LINES[(rows, cols, k)]
+
+
+def winner(board, k=None):
     """
     Returns the winner of the game, if there is one.
     """
-    for row in board:
-        if row.count(X)==3:
-            return X
-        elif row.count(O)==3:
-            return O
-    for col in range(3):
-        if board[0][col]==board[1][col]==board[2][col]==X:
-            return X
-        elif board[0][col]==board[1][col]==board[2][col]==O:
-            return O
-    if board[0][0]==board[1][1]==board[2][2]==X or board[0][2]==board[1][1]==board[2][0]==X:
-        return X
-    elif board[0][0]==board[1][1]==board[2][2]==O or board[0][2]==board[1][1]==board[2][0]==O:
-        return O
+    for line in lines(len(board), len(board[0]), win_length(board, k)):
+        i, j = line[0]
+        first = board[i][j]
+        if first is EMPTY:
+            continue
+        for a, b in line:
+            if board[a][b] != first:
+                break
+        else:
+            return first
     return None
 
 
-def terminal(board):
+def terminal(board, k=None):
     """
     Returns True if game is over, False otherwise.
     """
-    if winner(board) or not actions(board):
+    if winner(board, k) or not actions(board):
         return True
     return False
 
 
-def utility(board):
+def utility(board, k=None):
     """
     Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
     """
-    if terminal(board):
-        if winner(board)==X:
+    if terminal(board, k):
+        if winner(board, k)==X:
             return 1
-        elif winner(board)==O:
+        elif winner(board, k)==O:
             return -1
         else:
             return 0
         
 
 
-def minimax(board):
+def search_order(rows, cols):
+    """
+    Returns every cell of a rows x cols board in the order the exact
+    search tries them: the centre, then the corners, then the edges.
+    """
+    if (rows, cols) not in ORDERS:
+        def rank(cell):
+            i, j = cell
+            if 2 * i == rows - 1 and 2 * j == cols - 1:
+                return 0
+            if i in (0, rows - 1) and j in (0, cols - 1):
+                return 1
+            return 2
+        cells = [(i, j) for i in range(rows) for j in range(cols)]
+        ORDERS[(rows, cols)] = sorted(cells, key=rank)
+    return ORDERS[(rows, cols)]
+
+
+def ordered_moves(board):
+    """
+    Returns the empty cells of the board in search order.
+    """
+    return [
+        (i, j) for i, j in search_order(len(board), len(board[0]))
+        if board[i][j] is EMPTY
+    ]
+
+
+def symmetries(rows, cols):
+    """
+    Returns the board's rotations and reflections (8 for a square board,
+    4 otherwise), each as the (row, col) cells read in order to produce
+    the transformed board.
+    """
+    if (rows, cols) not in SYMMETRIES:
+        r, c = rows - 1, cols - 1
+        transforms = [
+            lambda i, j: (i, j),
+            lambda i, j: (r - i, c - j),
+            lambda i, j: (i, c - j),
+            lambda i, j: (r - i, j),
+        ]
+        if rows == cols:
+            transforms += [
+                lambda i, j: (j, c - i),
+                lambda i, j: (c - j, i),
+                lambda i, j: (j, i),
+                lambda i, j: (c - j, c - i),
+            ]
+        SYMMETRIES[(rows, cols)] = [
+            [transform(i, j) for i in range(rows) for j in range(cols)]
+            for transform in transforms
+        ]
+    return SYMMETRIES[(rows, cols)]
+
+
+def encode(board):
+    """
+    Returns the board's cells, read row by row, as a base-3 number with
+    EMPTY, X and O as the digits 0, 1 and 2.
+    """
+    digits = {EMPTY: 0, X: 1, O: 2}
+    key = 0
+    for row in board:
+        for cell in row:
+            key = key * 3 + digits[cell]
+    return key
+
+
+def book_move(board, k=None):
+    """
+    Returns the opening book's action for a 3x3 board with k = 3, or None
+    if there is no book or no entry for the board.
+    """
+    if book is None or len(board) != 3 or len(board[0]) != 3:
+        return None
+    if win_length(board, k) != 3:
+        return None
+    entry = book[encode(board)]
+    if entry == NO_MOVE:
+        return None
+    return divmod(entry & 0x0F, 3)
+
+
+def canonical(board, k=None):
+    """
+    Returns a key shared by the board and all its rotations and
+    reflections: its shape and win length, and the smallest base-3
+    encoding among them.
+    """
+    digits = {EMPTY: 0, X: 1, O: 2}
+    keys = []
+    for symmetry in symmetries(len(board), len(board[0])):
+        key = 0
+        for i, j in symmetry:
+            key = key * 3 + digits[board[i][j]]
+        keys.append(key)
+    return len(board), len(board[0]), win_length(board, k), min(keys)
+
+
+def lookup(board, alpha, beta, k=None):
+    """
+    Returns (value, alpha, beta) for a board from the transposition
+    table: value is set if the stored entry settles the search, and the
+    window is narrowed by any stored bound.
+    """
+    entry = transpositions.get(canonical(board, k))
+    if entry is None:
+        return None, alpha, beta
+    value, bound = entry
+    if bound == EXACT:
+        return value, alpha, beta
+    if bound == LOWER:
+        alpha = max(alpha, value)
+    else:
+        beta = min(beta, value)
+    if alpha >= beta:
+        return value, alpha, beta
+    return None, alpha, beta
+
+
+def store(board, value, alpha, beta, k=None):
+    """
+    Records the value searched for a board with window (alpha, beta).
+    """
+    if value <= alpha:
+        bound = UPPER
+    elif value >= beta:
+        bound = LOWER
+    else:
+        bound = EXACT
+    transpositions[canonical(board, k)] = (value, bound)
+
+
+def minimax(board, k=None, time_limit=TIME_LIMIT, cancel=None):
     """
     Returns the optimal action for the current player on the board.
+
+    Boards larger than EXACT_CELLS return the best action found within
+    `time_limit` seconds instead. Setting the threading.Event `cancel`
+    stops the search: an exact search raises Timeout, and a timed one
+    returns the best action found so far.
     """
-    if terminal(board):
+    k = win_length(board, k)
+    if terminal(board, k):
         return None
-    if player(board) == 'X':
-        best_score = -math.inf
-        best_action = None
-        for action in actions(board):
-            score = min_value(result(board, action), -math.inf, math.inf)  # Min node follows
-            if score > best_score:
-                best_score = score
+    action = book_move(board, k)
+    if action is not None:
+        return action
+    if len(board) * len(board[0]) > EXACT_CELLS:
+        return iterative_deepening(board, k, time_limit, cancel)
+    # Bounds found for earlier root moves carry over to later ones, so
+    # a move is only searched far enough to show it is no better
+    alpha, beta = -math.inf, math.inf
+    best_action = None
+    if player(board) == X:
+        for action in ordered_moves(board):
+            score = min_value(result(board, action), alpha, beta, k, cancel)  # Min node follows
+            if score > alpha:
+                alpha = score
                 best_action = action
-    elif player(board) == 'O':  # current_player == O
-        best_score = math.inf
-        best_action = None
-        for action in actions(board):
-            score = max_value(result(board, action), -math.inf, math.inf)  # Max node follows
-            if score < best_score:
-                best_score = score
+    else:
+        for action in ordered_moves(board):
+            score = max_value(result(board, action), alpha, beta, k, cancel)  # Max node follows
+            if score < beta:
+                beta = score
                 best_action = action
-
     return best_action
 
 
-def max_value(board, alpha, beta):
+def max_value(board, alpha, beta, k=None, cancel=None):
     """Returns the maximum possible score for X."""
-    if terminal(board):  
-        return utility(board)  # If game is over, return score.
+    global nodes
+    nodes += 1
+    if cancel is not None and cancel.is_set():
+        raise Timeout
+    if terminal(board, k):  
+        return utility(board, k)  # If game is over, return score.
+
+    cached, alpha, beta = lookup(board, alpha, beta, k)
+    if cached is not None:
+        return cached
+    window = alpha, beta
 
     value = -math.inf
-    for action in actions(board):
+    for action in ordered_moves(board):
         new_board = result(board, action)  # 先计算新局面
-        if terminal(new_board):  # 检查新局面是否终局
-            return utility(new_board)  # 直接返回该局面的最终分数
-        
-        value = max(value, min_value(new_board, alpha, beta))  # 递归计算最小值
+        value = max(value, min_value(new_board, alpha, beta, k, cancel))  # 递归计算最小值
         alpha = max(alpha, value)  # 更新 α 值
         if alpha >= beta:
             break  # 进行 α-β 剪枝
+    store(board, value, *window, k)
     return value
 
 
-def min_value(board, alpha, beta):
+def min_value(board, alpha, beta, k=None, cancel=None):
     """Returns the minimum possible score for O."""
-    if terminal(board):  
-        return utility(board)  # If game is over, return score.
+    global nodes
+    nodes += 1
+    if cancel is not None and cancel.is_set():
+        raise Timeout
+    if terminal(board, k):  
+        return utility(board, k)  # If game is over, return score.
+
+    cached, alpha, beta = lookup(board, alpha, beta, k)
+    if cached is not None:
+        return cached
+    window = alpha, beta
 
     value = math.inf
-    for action in actions(board):
+    for action in ordered_moves(board):
         new_board = result(board, action)  # 先计算新局面
-        if terminal(new_board):  # 检查新局面是否终局
-            return utility(new_board)  # 直接返回该局面的最终分数
-        
-        value = min(value, max_value(new_board, alpha, beta))  # 递归计算最大值
+        value = min(value, max_value(new_board, alpha, beta, k, cancel))  # 递归计算最大值
         beta = min(beta, value)  # 更新 β 值
         if alpha >= beta:
             break  # 进行 α-β 剪枝
+    store(board, value, *window, k)
     return value
-    
+
+
+def iterative_deepening(board, k=None, time_limit=TIME_LIMIT, cancel=None):
+    """
+    Returns the best action found by depth-limited alpha-beta searches of
+    increasing depth, keeping the result of the deepest search finished
+    within `time_limit` seconds, or before `cancel` is set. Each search
+    tries the previous best action first.
+    """
+    k = win_length(board, k)
+    deadline = time.monotonic() + time_limit
+    board = [row[:] for row in board]
+    turn = player(board)
+    moves = ordered_actions(board)
+    best_action = moves[0]
+
+    for depth in range(1, len(moves) + 1):
+        try:
+            value, best_action = search_root(board, moves, depth, turn, k, deadline, cancel)
+        except Timeout:
+            break
+        moves.remove(best_action)
+        moves.insert(0, best_action)
+
+        # A forced win or loss won't change with more depth
+        if abs(value) > WIN_SCORE - depth - 1:
+            break
+    return best_action
+
+
+def search_root(board, moves, depth, turn, k, deadline, cancel=None):
+    """
+    Returns (value, action) for the best of `moves` for `turn`, searching
+    `depth` moves ahead.
+    """
+    other = O if turn == X else X
+    alpha = -math.inf
+    best_action = moves[0]
+    for i, j in moves:
+        board[i][j] = turn
+        if wins_through(board, i, j, k):
+            value = WIN_SCORE
+        else:
+            value = -negamax(board, depth - 1, -math.inf, -alpha, other, k,
+                             deadline, 1, cancel)
+        board[i][j] = EMPTY
+        if value > alpha:
+            alpha = value
+            best_action = (i, j)
+    return alpha, best_action
+
+
+def negamax(board, depth, alpha, beta, turn, k, deadline, ply, cancel=None):
+    """
+    Returns the value of the board for `turn`, who moves next, searching
+    `depth` moves ahead and scoring the positions there heuristically.
+    Moves are made and undone on `board` in place.
+    """
+    global nodes
+    nodes += 1
+    if time.monotonic() > deadline or cancel is not None and cancel.is_set():
+        raise Timeout
+    if depth == 0:
+        return evaluate(board, turn, k)
+    moves = ordered_actions(board)
+    if not moves:
+        return 0
+
+    other = O if turn == X else X
+    value = -math.inf
+    for i, j in moves:
+        board[i][j] = turn
+        if wins_through(board, i, j, k):
+            score = WIN_SCORE - ply
+        else:
+            score = -negamax(board, depth - 1, -beta, -alpha, other, k,
+                             deadline, ply + 1, cancel)
+        board[i][j] = EMPTY
+        value = max(value, score)
+        alpha = max(alpha, value)
+        if alpha >= beta:
+            break
+    return value
+
+
+def ordered_actions(board):
+    """
+    Returns the empty cells worth searching, best candidates first: the
+    centre on an empty board, otherwise cells next to a claimed cell,
+    ordered by how many claimed neighbours they have and then by how
+    close they are to the centre.
+    """
+    rows, cols = len(board), len(board[0])
+    center = ((rows - 1) / 2, (cols - 1) / 2)
+    candidates = []
+    for i in range(rows):
+        for j in range(cols):
+            if board[i][j] is not EMPTY:
+                continue
+            neighbours = sum(
+                1
+                for a in range(max(i - 1, 0), min(i + 2, rows))
+                for b in range(max(j - 1, 0), min(j + 2, cols))
+                if board[a][b] is not EMPTY
+            )
+            distance = abs(i - center[0]) + abs(j - center[1])
+            candidates.append((-neighbours, distance, (i, j)))
+    candidates.sort()
+    if candidates and candidates[0][0] < 0:
+        return [cell for neighbours, _, cell in candidates if neighbours < 0]
+    return [cell for _, _, cell in candidates]
+
+
+def wins_through(board, i, j, k):
+    """
+    Returns True if the player on cell (i, j) has k in a line through it.
+    """
+    mark = board[i][j]
+    rows, cols = len(board), len(board[0])
+    for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+        count = 1
+        for sign in (1, -1):
+            a, b = i + sign * di, j + sign * dj
+            while 0 <= a < rows and 0 <= b < cols and board[a][b] == mark:
+                count += 1
+                a, b = a + sign * di, b + sign * dj
+        if count >= k:
+            return True
+    return False
+
+
+def evaluate(board, turn, k):
+    """
+    Returns a heuristic value of the board for `turn`: every line still
+    open to only one player scores 10 ** (cells claimed in it), for that
+    player and against the other. A player to move who can complete a
+    line, or an opponent with two different cells that would, decides
+    the game, which scores THREAT_SCORE.
+    """
+    score = 0
+    threats = {X: set(), O: set()}
+    for line in lines(len(board), len(board[0]), k):
+        xs = noughts = 0
+        for i, j in line:
+            if board[i][j] == X:
+                xs += 1
+            elif board[i][j] == O:
+                noughts += 1
+        if xs and not noughts:
+            score += 10 ** xs
+            if xs == k - 1:
+                threats[X].add(empty_cell(board, line))
+        elif noughts and not xs:
+            score -= 10 ** noughts
+            if noughts == k - 1:
+                threats[O].add(empty_cell(board, line))
+
+    other = O if turn == X else X
+    if threats[turn]:
+        return THREAT_SCORE
+    if len(threats[other]) > 1:
+        return -THREAT_SCORE
+    return score if turn == X else -score
+
+
+def empty_cell(board, line):
+    """
+    Returns the first empty cell in `line`.
+    """
+    return next((i, j) for i, j in line if board[i][j] is EMPTY)
@@ -0,0 +1,178 @@
+"""
+Headless self-play tournament between tic tac toe engines
+
+Plays games between two engines, alternating which one plays X, across
+worker processes, and reports games per second, per-move latency
+percentiles for each engine and the first engine's win/draw/loss rates.
+
+Usage: python tournament.py [options] engine engine
+"""
+
+import argparse
+import multiprocessing
+import random
+import statistics
+import time
+from functools import partial
+
+import bitboard
+import tictactoe as ttt
+
+
+def random_move(board, k, time_limit, rng):
+    return rng.choice(sorted(ttt.actions(board)))
+
+
+def search_move(board, k, time_limit, rng):
+    # Every move is searched from scratch: no book, no remembered table
+    table, ttt.book = ttt.book, None
+    ttt.transpositions.clear()
+    try:
+        return ttt.minimax(board, k, time_limit)
+    finally:
+        ttt.book = table
+
+
+def cached_move(board, k, time_limit, rng):
+    # The transposition table is kept from move to move and game to game
+    table, ttt.book = ttt.book, None
+    try:
+        return ttt.minimax(board, k, time_limit)
+    finally:
+        ttt.book = table
+
+
+def book_move(board, k, time_limit, rng):
+    return ttt.minimax(board, k, time_limit)
+
+
+def bitboard_move(board, k, time_limit, rng):
+    return bitboard.minimax(board)
+
+
+# Engine name -> function choosing a move given (board, k, time_limit, rng)
+ENGINES = {
+    "random": random_move,
+    "minimax": search_move,
+    "cached": cached_move,
+    "book": book_move,
+    "bitboard": bitboard_move,
+}
+
+# Engines that only play the standard 3x3 game
+STANDARD_ONLY = {"book", "bitboard"}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Play tic tac toe engines against each other."
+    )
+    parser.add_argument("engines", nargs=2, choices=sorted(ENGINES),
+                        metavar="engine",
+                        help=f"one of {', '.join(sorted(ENGINES))}")
+    parser.add_argument("--games", type=int, default=1000,
+                        help="number of games to play (default 1000)")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="processes to play games in (0 = one per CPU)")
+    parser.add_argument("--board", type=int, nargs=3, default=(3, 3, 3),
+                        metavar=("ROWS", "COLS", "K"),
+                        help="board shape and win length (default 3 3 3)")
+    parser.add_argument("--seconds", type=float, default=ttt.TIME_LIMIT,
+                        help="time limit per move on boards searched to a "
+                             "depth (default %(default)s)")
+    parser.add_argument("--opening", type=int, default=0,
+                        help="random moves played before the engines take "
+                             "over, to vary the games (default 0)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed for the random moves (default 0)")
+    args = parser.parse_args()
+    if args.games < 1:
+        parser.error("--games must be at least 1")
+    if tuple(args.board) != (3, 3, 3) and STANDARD_ONLY & set(args.engines):
+        parser.error(f"{', '.join(sorted(STANDARD_ONLY))} only play 3x3 "
+                     "boards with k = 3")
+
+    play_game = partial(
+        play, engines=args.engines, board=tuple(args.board),
+        time_limit=args.seconds, opening=args.opening, seed=args.seed
+    )
+    start = time.perf_counter()
+    results = tournament(play_game, args.games, args.workers or None)
+    elapsed = time.perf_counter() - start
+    report(args.engines, results, elapsed)
+
+
+def tournament(play_game, games, workers=None):
+    """
+    Returns the results of `play_game` for game numbers 0 to games - 1,
+    played across `workers` processes (one per CPU if None).
+    """
+    if workers == 1:
+        return list(map(play_game, range(games)))
+    with multiprocessing.Pool(workers) as pool:
+        chunk = max(1, games // (4 * (workers or multiprocessing.cpu_count())))
+        return list(pool.imap_unordered(play_game, range(games), chunk))
+
+
+def play(game, engines, board=(3, 3, 3), time_limit=ttt.TIME_LIMIT,
+         opening=0, seed=0):
+    """
+    Plays game number `game`, in which the first of the two `engines`
+    plays X in even games and O in odd ones. Returns (score, latencies):
+    1, 0 or -1 as the first engine wins, draws or loses, and the
+    seconds each engine took for each of its moves.
+    """
+    rows, cols, k = board
+    rng = random.Random(seed * 1000003 + game)
+    first = ttt.X if game % 2 == 0 else ttt.O
+    sides = {ttt.X: engines[game % 2], ttt.O: engines[1 - game % 2]}
+    latencies = {engine: [] for engine in engines}
+
+    board = ttt.initial_state(rows, cols)
+    for _ in range(opening):
+        if ttt.terminal(board, k):
+            break
+        board = ttt.result(board, random_move(board, k, time_limit, rng))
+
+    while not ttt.terminal(board, k):
+        engine = sides[ttt.player(board)]
+        start = time.perf_counter()
+        action = ENGINES[engine](board, k, time_limit, rng)
+        latencies[engine].append(time.perf_counter() - start)
+        board = ttt.result(board, action)
+
+    won = ttt.winner(board, k)
+    if won is None:
+        return 0, latencies
+    return (1 if won == first else -1), latencies
+
+
+def report(engines, results, elapsed):
+    """
+    Prints the tournament's speed, latency and outcome statistics.
+    """
+    games = len(results)
+    latencies = {engine: [] for engine in engines}
+    for _, moves in results:
+        for engine, times in moves.items():
+            latencies[engine].extend(times)
+
+    print(f"{games} games in {elapsed:.2f}s ({games / elapsed:.1f} games/s)")
+    print("Move latency (ms):      p50       p90       p99       max")
+    for engine, times in latencies.items():
+        if len(times) < 2:
+            continue
+        cuts = statistics.quantiles(times, n=100, method="inclusive")
+        print(f"  {engine:<12}" + "".join(
+            f" {cut * 1e3:>9.3f}" for cut in (cuts[49], cuts[89], cuts[98], max(times))
+        ))
+
+    scores = [score for score, _ in results]
+    wins, draws, losses = scores.count(1), scores.count(0), scores.count(-1)
+    print(f"{engines[0]} vs {engines[1]}: "
+          f"{wins / games:.1%} won, {draws / games:.1%} drawn, "
+          f"{losses / games:.1%} lost")
+
+
+if __name__ == "__main__":
+    main()
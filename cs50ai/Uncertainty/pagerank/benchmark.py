@@ -0,0 +1,92 @@
+import random
+import sys
+import time
+
+import pagerank
+
+# Corpus sizes ranked by default, and the largest the original
+# iteration is timed on
+SIZES = [1000, 100000, 1000000]
+LEGACY_LIMIT = 1000
+
+# Each page links to between 0 and MAX_LINKS others
+MAX_LINKS = 8
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+    print(f"{'pages':>9} {'links':>9} {'build s':>8} {'rank s':>8} "
+          f"{'legacy s':>9} {'max diff':>9}")
+    for size in sizes:
+        corpus = synthetic_corpus(size)
+        links = sum(map(len, corpus.values()))
+
+        start = time.perf_counter()
+        matrix = pagerank.link_matrix(corpus)
+        build = time.perf_counter() - start
+        start = time.perf_counter()
+        ranks = dict(zip(matrix[0], pagerank.power_iteration(
+            *matrix[1:], pagerank.DAMPING
+        )))
+        rank = time.perf_counter() - start
+
+        legacy = difference = ""
+        if size <= LEGACY_LIMIT:
+            start = time.perf_counter()
+            old = legacy_iterate_pagerank(corpus, pagerank.DAMPING)
+            legacy = f"{time.perf_counter() - start:.3f}"
+            difference = f"{max(abs(ranks[page] - old[page]) for page in corpus):.5f}"
+
+        print(f"{size:>9} {links:>9} {build:>8.3f} {rank:>8.3f} "
+              f"{legacy:>9} {difference:>9}")
+
+
+def synthetic_corpus(size, seed=0):
+    """
+    Returns a corpus of `size` pages, each linking to up to MAX_LINKS
+    others at random.
+    """
+    rng = random.Random(seed)
+    pages = [f"{n}.html" for n in range(size)]
+    corpus = {}
+    for n, page in enumerate(pages):
+        links = set()
+        for _ in range(rng.randint(0, MAX_LINKS)):
+            other = rng.randrange(size)
+            if other != n:
+                links.add(pages[other])
+        corpus[page] = links
+    return corpus
+
+
+def legacy_iterate_pagerank(corpus, damping_factor):
+    """
+    The original iterate_pagerank, kept for comparison: each sweep scans
+    the whole corpus for every page.
+    """
+    appearance = {}
+    num_pages = len(corpus)
+    accuracy = 0.001
+    extra_appearance = 0
+    for page in corpus:
+        appearance[page] = 1 / num_pages
+    while True:
+        flag = 0
+        for page in corpus:
+            for i in corpus:
+                if len(corpus[i]) == 0:
+                    extra_appearance = damping_factor * appearance[i] / num_pages
+            new_appearance = ((1 - damping_factor) / num_pages) + extra_appearance
+            for i in corpus:
+                if page in corpus[i]:
+                    new_appearance += damping_factor * appearance[i] / len(corpus[i])
+            if abs(appearance[page] - new_appearance) > accuracy:
+                flag = 1
+            appearance[page] = new_appearance
+        if flag == 0:
+            break
+    return appearance
+
+
+if __name__ == "__main__":
+    main()
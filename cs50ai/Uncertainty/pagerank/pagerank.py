@@ -2,10 +2,14 @@ import os
 import random
 import re
 import sys
+from array import array
 
 DAMPING = 0.85
 SAMPLES = 10000
 
+# Iteration stops once the ranks change by less than this in total
+TOLERANCE = 1e-6
+
 
 def main():
     if len(sys.argv) != 2:
@@ -89,7 +93,7 @@ def sample_pagerank(corpus, damping_factor, n):
     return  appearance
 
 
-def iterate_pagerank(corpus, damping_factor):
+def iterate_pagerank(corpus, damping_factor, tolerance=TOLERANCE):
     """
     Return PageRank values for each page by iteratively updating
     PageRank values until convergence.
@@ -98,40 +102,78 @@ def iterate_pagerank(corpus, damping_factor):
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
     """
-    appearance={}
-    num_pages=len(corpus)
-    accuracy=0.001
-    extra_appearance=0
-    for page in corpus:
-        appearance[page]=1/num_pages
+    pages, offsets, sources, out_degrees = link_matrix(corpus)
+    ranks = power_iteration(offsets, sources, out_degrees, damping_factor, tolerance)
+    return dict(zip(pages, ranks))
+
+
+def link_matrix(corpus):
+    """
+    Return (pages, offsets, sources, out_degrees), the corpus's links in
+    compressed sparse row (CSR) form, with pages numbered by their
+    position in `pages`. The pages linking to page p are
+        sources[offsets[p]:offsets[p + 1]]
+    and out_degrees[p] is the number of pages p links to. Links to pages
+    outside the corpus are ignored.
+    """
+    pages = list(corpus)
+    index = {page: n for n, page in enumerate(pages)}
+    links = [
+        [index[link] for link in corpus[page] if link in index]
+        for page in pages
+    ]
+
+    # Count each page's in-links, then place every link in its row
+    out_degrees = array("i", map(len, links))
+    offsets = array("q", [0]) * (len(pages) + 1)
+    for targets in links:
+        for target in targets:
+            offsets[target + 1] += 1
+    for page in range(len(pages)):
+        offsets[page + 1] += offsets[page]
+
+    sources = array("i", [0]) * offsets[-1]
+    position = offsets[:-1]
+    for source, targets in enumerate(links):
+        for target in targets:
+            sources[position[target]] = source
+            position[target] += 1
+    return pages, offsets, sources, out_degrees
+
+
+def power_iteration(offsets, sources, out_degrees, damping_factor, tolerance=TOLERANCE):
+    """
+    Return the list of PageRank values for the pages of a link matrix
+    from link_matrix, by power iteration until the ranks change by less
+    than `tolerance` in total (L1 distance) from one sweep to the next.
+
+    A page with no links is treated as linking to every page, so its
+    rank is spread evenly across the corpus.
+    """
+    n = len(out_degrees)
+    if n == 0:
+        return []
+    ranks = [1 / n] * n
+    inverse = [1 / degree if degree else 0.0 for degree in out_degrees]
+    dangling = [page for page in range(n) if not out_degrees[page]]
+
     while True:
-        flag=0
-        # 遍历所有页面，计算新的 PageRank 值
-        for page in corpus:
-            for i in corpus:
-                if len(corpus[i])==0:
-                    extra_appearance=damping_factor*appearance[i]/num_pages
-            # 初始 PageRank 公式的一部分（考虑随机跳转）
-            new_appearance = ((1 - damping_factor) / num_pages  )+extra_appearance
-
-        # 遍历 corpus，找到所有指向 `page` 的网页
-            for i in corpus:
-                if page in corpus[i]:  
-                    # 计算 PageRank 传递贡献部分
-                    new_appearance += damping_factor * appearance[i] / len(corpus[i])
-
-
-            # 判断 PageRank 值是否收敛
-            if abs(appearance[page] - new_appearance) > accuracy:
-                flag = 1  # 标记还没有收敛
-
-            # 更新 PageRank 值
-            appearance[page] = new_appearance  
-
-        # 如果所有页面的 PageRank 值变化都小于 accuracy，就停止迭代
-        if flag == 0:
-            break
-    return appearance
+        # Rank each page passes along each of its links
+        shares = [rank * weight for rank, weight in zip(ranks, inverse)]
+        leaked = sum(ranks[page] for page in dangling)
+        base = (1 - damping_factor + damping_factor * leaked) / n
+
+        new_ranks = [
+            base + damping_factor * sum(
+                shares[source] for source in sources[offsets[page]:offsets[page + 1]]
+            )
+            for page in range(n)
+        ]
+        change = sum(abs(new - old) for new, old in zip(new_ranks, ranks))
+        ranks = new_ranks
+        if change < tolerance:
+            total = sum(ranks)
+            return [rank / total for rank in ranks]
 
 
 if __name__ == "__main__":